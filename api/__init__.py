@@ -1,6 +1,6 @@
 """API package"""
 from .main import app
-from .queue import job_queue, Job
-from .models import JobStatus, JobResponse, JobDetailResponse
+from .queue import job_queue, Job, JobCommit
+from .models import JobStatus, JobResponse, JobDetailResponse, JobSummary
 
-__all__ = ["app", "job_queue", "Job", "JobStatus", "JobResponse", "JobDetailResponse"]
+__all__ = ["app", "job_queue", "Job", "JobCommit", "JobStatus", "JobResponse", "JobDetailResponse", "JobSummary"]
@@ -6,15 +6,17 @@ from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
 
 from .routes import router
+# Module import (not `from ... import worker`) so importing worker.processor
+# first, which pulls in api.queue and thus this module, doesn't hit a cycle
+import worker.processor as processor
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Lifespan events: start/stop the conversion worker"""
-    from worker.processor import worker
-    worker.start()
+    processor.worker.start()
     yield
-    worker.stop()
+    processor.worker.stop()
 
 
 app = FastAPI(
@@ -48,8 +50,7 @@ async def read_root():
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
-    from worker.processor import worker
     return {
         "status": "healthy",
-        "worker_running": worker.is_running
+        "worker_running": processor.worker.is_running
     }
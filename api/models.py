@@ -27,3 +27,11 @@ class JobDetailResponse(JobResponse):
     output_path: Optional[str] = None
     error: Optional[str] = None
     completed_at: Optional[datetime] = None
+
+
+class JobSummary(BaseModel):
+    """Compact job entry for the job listing"""
+    job_id: str
+    status: JobStatus
+    source_filename: str
+    created_at: datetime
@@ -1,49 +1,103 @@
 """In-memory job queue for HWP conversion"""
+import os
 import threading
+import time
 import uuid
-from datetime import datetime
+from collections import deque
 from typing import Dict, Optional, List
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 
 from .models import JobStatus
 
 
 @dataclass
 class Job:
-    """Internal job representation"""
+    """Internal job representation; updates replace it rather than mutate it"""
     job_id: str
     source_filename: str
     source_path: str
+    source_ext: str = ""
+    target_path: str = ""
     output_path: Optional[str] = None
     status: JobStatus = JobStatus.PENDING
-    created_at: datetime = field(default_factory=datetime.now)
-    completed_at: Optional[datetime] = None
+    created_at: float = field(default_factory=time.time)
+    completed_at: Optional[float] = None
     error: Optional[str] = None
+    output_verified: bool = False
+
+
+def _with_source(job: Job, source_path: str) -> Job:
+    """Return a snapshot of `job` pointing at `source_path`, with derived paths"""
+    return replace(
+        job,
+        source_path=source_path,
+        source_ext=os.path.splitext(source_path)[1].lower(),
+        target_path=os.path.join(os.path.dirname(source_path), "output.pdf"),
+    )
+
+
+# Number of independently locked job shards (must be a power of two)
+SHARD_COUNT = 16
+
+# Finished jobs kept in memory before the oldest ones are evicted
+MAX_FINISHED_JOBS = 1000
 
 
 class JobQueue:
-    """Thread-safe in-memory job queue"""
-    
-    def __init__(self):
-        self._jobs: Dict[str, Job] = {}
-        self._lock = threading.Lock()
-    
-    def add_job(self, source_filename: str, source_path: str) -> Job:
-        """Add a new job to the queue"""
-        job_id = str(uuid.uuid4())
-        job = Job(
-            job_id=job_id,
-            source_filename=source_filename,
-            source_path=source_path,
+    """Thread-safe in-memory job queue with sharded locks and lock-free reads"""
+    
+    def __init__(self, max_finished_jobs: int = MAX_FINISHED_JOBS):
+        self._shards: List[Dict[str, Job]] = [{} for _ in range(SHARD_COUNT)]
+        self._shard_locks = [threading.Lock() for _ in range(SHARD_COUNT)]
+        self._pending: deque[str] = deque()
+        self._pending_cond = threading.Condition()
+        self._max_finished_jobs = max_finished_jobs
+        self._finished: deque[str] = deque()
+        self._finished_lock = threading.Lock()
+    
+    def _shard(self, job_id: str) -> int:
+        """Get the shard index for a job ID"""
+        return hash(job_id) & (SHARD_COUNT - 1)
+    
+    def add_job(self, source_filename: str, source_path: str, enqueue: bool = True) -> Job:
+        """
+        Add a new job to the queue.
+        
+        With `enqueue=False` the job is registered but not handed to workers
+        until `enqueue()` is called, e.g. once its source file is saved.
+        """
+        job_id = uuid.uuid4().hex
+        job = _with_source(
+            Job(job_id=job_id, source_filename=source_filename, source_path=""),
+            source_path,
         )
-        with self._lock:
-            self._jobs[job_id] = job
+        index = self._shard(job_id)
+        with self._shard_locks[index]:
+            self._shards[index][job_id] = job
+        if enqueue:
+            self.enqueue(job_id)
         return job
     
+    def enqueue(self, job_id: str, source_path: Optional[str] = None) -> None:
+        """
+        Make a job available to workers and wake one waiting worker.
+        
+        If `source_path` is given, the job is pointed at it first, for jobs
+        registered before their source file was saved.
+        """
+        if source_path is not None:
+            index = self._shard(job_id)
+            with self._shard_locks[index]:
+                job = self._shards[index].get(job_id)
+                if job:
+                    self._shards[index][job_id] = _with_source(job, source_path)
+        with self._pending_cond:
+            self._pending.append(job_id)
+            self._pending_cond.notify()
+    
     def get_job(self, job_id: str) -> Optional[Job]:
         """Get job by ID"""
-        with self._lock:
-            return self._jobs.get(job_id)
+        return self._shards[self._shard(job_id)].get(job_id)
     
     def update_status(
         self, 
@@ -53,38 +107,150 @@ class JobQueue:
         error: Optional[str] = None
     ) -> bool:
         """Update job status"""
-        with self._lock:
-            job = self._jobs.get(job_id)
+        index = self._shard(job_id)
+        finished = status in (JobStatus.COMPLETED, JobStatus.FAILED)
+        with self._shard_locks[index]:
+            job = self._shards[index].get(job_id)
             if not job:
                 return False
-            job.status = status
+            changes = {"status": status}
             if output_path:
-                job.output_path = output_path
+                changes["output_path"] = output_path
             if error:
-                job.error = error
-            if status in (JobStatus.COMPLETED, JobStatus.FAILED):
-                job.completed_at = datetime.now()
-            return True
+                changes["error"] = error
+            if finished:
+                changes["completed_at"] = time.time()
+            if status == JobStatus.COMPLETED and output_path:
+                # Check once here so downloads can trust the flag without a stat
+                try:
+                    os.stat(output_path)
+                    changes["output_verified"] = True
+                except OSError:
+                    pass
+            self._shards[index][job_id] = replace(job, **changes)
+            finished = finished and job.completed_at is None
+        # Evict outside the shard lock so two shard locks are never held at once
+        if finished:
+            self._retire(job_id)
+        return True
+    
+    def begin_job(self, job_id: str) -> "JobCommit":
+        """
+        Mark a job PROCESSING and return a handle that records its outcome.
+        
+        Use it as a context manager; a job left without an outcome when the
+        block exits is marked FAILED.
+        """
+        self.update_status(job_id, JobStatus.PROCESSING)
+        return JobCommit(self, job_id)
+    
+    def _retire(self, job_id: str) -> None:
+        """Record a finished job and evict the oldest ones over the limit"""
+        with self._finished_lock:
+            self._finished.append(job_id)
+            evicted = []
+            while len(self._finished) > self._max_finished_jobs:
+                evicted.append(self._finished.popleft())
+        for old_id in evicted:
+            index = self._shard(old_id)
+            with self._shard_locks[index]:
+                self._shards[index].pop(old_id, None)
     
     def get_next_pending(self) -> Optional[Job]:
         """Get the oldest pending job"""
-        with self._lock:
-            pending = [j for j in self._jobs.values() if j.status == JobStatus.PENDING]
-            if not pending:
-                return None
-            # Sort by created_at and return oldest
-            pending.sort(key=lambda x: x.created_at)
-            return pending[0]
+        with self._pending_cond:
+            return self._pop_pending()
+    
+    def get_next_pending_blocking(self, timeout: float) -> Optional[Job]:
+        """
+        Get the oldest pending job, waiting up to `timeout` seconds for one.
+        
+        Returns None on timeout or when woken by `wake_waiters()`.
+        """
+        jobs = self.get_next_pending_batch(1, timeout)
+        return jobs[0] if jobs else None
+    
+    def get_next_pending_batch(self, n: int, timeout: float = 0) -> List[Job]:
+        """
+        Claim up to `n` pending jobs, oldest first, in one lock acquisition.
+        
+        With a timeout, waits up to that long when nothing is pending.
+        """
+        with self._pending_cond:
+            jobs = self._pop_pending_batch(n)
+            if not jobs and timeout > 0:
+                self._pending_cond.wait(timeout)
+                jobs = self._pop_pending_batch(n)
+            return jobs
+    
+    def wake_waiters(self) -> None:
+        """Wake every worker blocked in get_next_pending_blocking (e.g. on shutdown)"""
+        with self._pending_cond:
+            self._pending_cond.notify_all()
+    
+    def _pop_pending(self) -> Optional[Job]:
+        """Pop the oldest job still pending; caller must hold the pending condition"""
+        while self._pending:
+            job = self.get_job(self._pending.popleft())
+            # Skip stale IDs for jobs that failed or were cleared before start
+            if job and job.status == JobStatus.PENDING:
+                return job
+        return None
+    
+    def _pop_pending_batch(self, n: int) -> List[Job]:
+        """Pop up to `n` pending jobs; caller must hold the pending condition"""
+        jobs: List[Job] = []
+        while len(jobs) < n:
+            job = self._pop_pending()
+            if job is None:
+                break
+            jobs.append(job)
+        return jobs
     
     def get_all_jobs(self) -> List[Job]:
-        """Get all jobs (for debugging/admin)"""
-        with self._lock:
-            return list(self._jobs.values())
+        """Get all jobs (for debugging/admin, may be slightly stale)"""
+        jobs: List[Job] = []
+        for shard in self._shards:
+            jobs.extend(list(shard.values()))
+        return jobs
     
     def clear(self) -> None:
         """Clear all jobs (for testing)"""
-        with self._lock:
-            self._jobs.clear()
+        with self._pending_cond:
+            for shard, lock in zip(self._shards, self._shard_locks):
+                with lock:
+                    shard.clear()
+            self._pending.clear()
+        with self._finished_lock:
+            self._finished.clear()
+
+
+class JobCommit:
+    """Outcome handle for a job in progress, returned by JobQueue.begin_job"""
+    
+    def __init__(self, queue: JobQueue, job_id: str):
+        self._queue = queue
+        self._job_id = job_id
+        self.done = False
+    
+    def complete(self, output_path: str) -> None:
+        """Mark the job COMPLETED with its output file"""
+        self._finish(JobStatus.COMPLETED, output_path, None)
+    
+    def fail(self, error: str) -> None:
+        """Mark the job FAILED with an error message"""
+        self._finish(JobStatus.FAILED, None, error)
+    
+    def _finish(self, status: JobStatus, output_path: Optional[str], error: Optional[str]) -> None:
+        self.done = True
+        self._queue.update_status(self._job_id, status, output_path, error)
+    
+    def __enter__(self) -> "JobCommit":
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        if not self.done:
+            self.fail(f"Unexpected error: {exc_val}" if exc_val else "Job ended without a result")
 
 
 # Global queue instance
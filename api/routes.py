@@ -1,25 +1,53 @@
 """API routes for HWP to PDF conversion"""
+import asyncio
 import os
-import shutil
-from pathlib import Path
-from typing import Optional
+from datetime import datetime
+from typing import List, Optional
+from urllib.parse import quote
 
-from fastapi import APIRouter, UploadFile, File, HTTPException
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, UploadFile, File, HTTPException, Request
+from fastapi.responses import FileResponse, Response
 
-from .models import JobResponse, JobDetailResponse, JobStatus
+from .models import JobResponse, JobDetailResponse, JobStatus, JobSummary
 from .queue import job_queue
 
 router = APIRouter()
 
 # Storage configuration
-STORAGE_DIR = Path(__file__).parent.parent / "storage"
-STORAGE_DIR.mkdir(exist_ok=True)
+STORAGE_DIR_STR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "storage"))
+os.makedirs(STORAGE_DIR_STR, exist_ok=True)
 
+# File types accepted for conversion
+ALLOWED_EXTS = frozenset({".hwp", ".hwpx", ".odt", ".docx"})
 
-def get_job_dir(job_id: str) -> Path:
+# Read uploads in 1 MB chunks so large files don't block the event loop
+UPLOAD_CHUNK_SIZE = 1 << 20
+
+# Behind nginx, hand PDF downloads off via X-Accel-Redirect. XACCEL_PREFIX must
+# be an `internal` location aliased to the storage directory.
+USE_XACCEL = os.environ.get("USE_XACCEL") == "1"
+XACCEL_PREFIX = os.environ.get("XACCEL_PREFIX", "/protected").rstrip("/")
+
+
+def get_job_dir(job_id: str) -> str:
     """Get the directory for a specific job"""
-    return STORAGE_DIR / job_id
+    return STORAGE_DIR_STR + os.sep + job_id
+
+
+def _make_job_dir(job_dir: str) -> None:
+    """Create a job directory; the storage root already exists and IDs are fresh"""
+    try:
+        os.mkdir(job_dir)
+    except FileExistsError:
+        pass
+
+
+def _content_disposition(filename: str) -> str:
+    """Build an attachment header, RFC 5987-encoding non-ASCII names"""
+    quoted = quote(filename)
+    if quoted != filename:
+        return f"attachment; filename*=utf-8''{quoted}"
+    return f'attachment; filename="{filename}"'
 
 
 @router.post("/upload", response_model=JobResponse)
@@ -33,58 +61,71 @@ async def upload_hwp(file: UploadFile = File(...)):
     if not file.filename:
         raise HTTPException(status_code=400, detail="Filename is required")
     
-    ext = Path(file.filename).suffix.lower()
-    if ext not in ('.hwp', '.hwpx', '.odt', '.docx'):
+    ext = os.path.splitext(file.filename)[1].lower()
+    if ext not in ALLOWED_EXTS:
         raise HTTPException(
             status_code=400, 
             detail=f"Invalid file type: {ext}. Only .hwp, .hwpx, .odt, .docx files are accepted."
         )
     
-    # Create job first to get ID
+    # Create job first to get ID; workers only see it once the file is saved
     job = job_queue.add_job(
         source_filename=file.filename,
-        source_path=""  # Will be set after saving
+        source_path="",  # Will be set after saving
+        enqueue=False
     )
     
     # Create job directory and save file
+    # Disk I/O runs in worker threads so concurrent requests keep flowing
     job_dir = get_job_dir(job.job_id)
-    job_dir.mkdir(parents=True, exist_ok=True)
-    
-    source_path = job_dir / f"source{ext}"
+    source_path = os.path.join(job_dir, f"source{ext}")
     
     try:
-        with open(source_path, "wb") as f:
-            shutil.copyfileobj(file.file, f)
+        await asyncio.to_thread(_make_job_dir, job_dir)
+        f = await asyncio.to_thread(open, source_path, "wb")
+        try:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                await asyncio.to_thread(f.write, chunk)
+        finally:
+            await asyncio.to_thread(f.close)
     except Exception as e:
         job_queue.update_status(job.job_id, JobStatus.FAILED, error=str(e))
         raise HTTPException(status_code=500, detail=f"Failed to save file: {e}")
     
-    # Update job with actual path
-    job.source_path = str(source_path)
+    # Point the job at the saved file, then hand it to the workers
+    job_queue.enqueue(job.job_id, source_path)
     
-    return JobResponse(
+    # Fields come straight from our typed Job, so skip Pydantic validation
+    return JobResponse.model_construct(
         job_id=job.job_id,
         status=job.status,
-        created_at=job.created_at,
+        created_at=datetime.fromtimestamp(job.created_at),
         message=f"File '{file.filename}' uploaded successfully. Conversion pending."
     )
 
 
 @router.get("/status/{job_id}", response_model=JobDetailResponse)
-async def get_job_status(job_id: str):
+async def get_job_status(job_id: str, request: Request, response: Response):
     """Get the status of a conversion job"""
     job = job_queue.get_job(job_id)
     if not job:
         raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
     
-    return JobDetailResponse(
+    # The body only changes with status, so pollers can revalidate cheaply
+    etag = f'W/"{job.status.value}-{job.completed_at or 0}"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    
+    # Polled in a tight loop by the UI; fields are already validated by type
+    return JobDetailResponse.model_construct(
         job_id=job.job_id,
         status=job.status,
-        created_at=job.created_at,
+        created_at=datetime.fromtimestamp(job.created_at),
         source_filename=job.source_filename,
         output_path=job.output_path,
         error=job.error,
-        completed_at=job.completed_at,
+        completed_at=datetime.fromtimestamp(job.completed_at) if job.completed_at else None,
     )
 
 
@@ -104,11 +145,23 @@ async def download_pdf(job_id: str):
     if job.status == JobStatus.FAILED:
         raise HTTPException(status_code=500, detail=f"Conversion failed: {job.error}")
     
-    if not job.output_path or not Path(job.output_path).exists():
+    if not job.output_verified:
         raise HTTPException(status_code=500, detail="Output file not found")
     
     # Generate download filename from original
-    download_name = Path(job.source_filename).stem + ".pdf"
+    download_name = os.path.splitext(os.path.basename(job.source_filename))[0] + ".pdf"
+    
+    # Only the job directory's own output.pdf is served through nginx; the URI
+    # is built from the job ID since relpath fails across Windows drives
+    if USE_XACCEL and job.output_path == get_job_dir(job_id) + os.sep + "output.pdf":
+        # nginx streams the file itself with sendfile
+        return Response(
+            media_type="application/pdf",
+            headers={
+                "X-Accel-Redirect": f"{XACCEL_PREFIX}/{quote(job_id)}/output.pdf",
+                "Content-Disposition": _content_disposition(download_name),
+            },
+        )
     
     return FileResponse(
         path=job.output_path,
@@ -117,16 +170,17 @@ async def download_pdf(job_id: str):
     )
 
 
-@router.get("/jobs")
+@router.get("/jobs", response_model=List[JobSummary])
 async def list_jobs():
     """List all jobs (for debugging)"""
-    jobs = job_queue.get_all_jobs()
+    # With a response model Pydantic serialises straight to JSON bytes,
+    # including datetimes, instead of going through per-job isoformat calls
     return [
-        {
-            "job_id": j.job_id,
-            "status": j.status,
-            "source_filename": j.source_filename,
-            "created_at": j.created_at.isoformat(),
-        }
-        for j in jobs
+        JobSummary.model_construct(
+            job_id=j.job_id,
+            status=j.status,
+            source_filename=j.source_filename,
+            created_at=datetime.fromtimestamp(j.created_at),
+        )
+        for j in job_queue.get_all_jobs()
     ]
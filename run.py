@@ -8,7 +8,8 @@ import tempfile
 import multiprocessing
 from pathlib import Path
 
-from src.hwp_converter.core import HwpToPdfConverter
+from src.hwp_converter.core import HWP_EXTENSIONS
+from src.hwp_converter.thread import HwpConversionThread
 
 
 def get_app_data_dir():
@@ -47,19 +48,26 @@ class Api:
     def __init__(self):
         self._window = None
         self._settings_path = get_app_data_dir() / "settings.json"
+        self._settings_cache = None
+        # 한글 COM 객체를 전용 스레드 하나에서 재사용
+        self._converter = HwpConversionThread()
 
     def set_window(self, window):
         self._window = window
 
     def _load_settings(self):
-        if self._settings_path.exists():
-            try:
-                return json.loads(self._settings_path.read_text(encoding="utf-8"))
-            except Exception:
-                pass
-        return {}
+        """설정 파일은 처음 한 번만 읽고 이후에는 캐시 사본 반환"""
+        if self._settings_cache is None:
+            self._settings_cache = {}
+            if self._settings_path.exists():
+                try:
+                    self._settings_cache = json.loads(self._settings_path.read_text(encoding="utf-8"))
+                except Exception:
+                    pass
+        return dict(self._settings_cache)
 
     def _save_settings(self, settings):
+        self._settings_cache = dict(settings)
         self._settings_path.write_text(
             json.dumps(settings, ensure_ascii=False, indent=2),
             encoding="utf-8"
@@ -110,15 +118,14 @@ class Api:
                 return {"success": False, "error": "파일을 찾을 수 없습니다."}
 
             ext = file_path.suffix.lower()
-            if ext not in ('.hwp', '.hwpx'):
+            if ext not in HWP_EXTENSIONS:
                 return {"success": False, "error": "지원하지 않는 파일 형식입니다."}
 
             temp_dir = Path(tempfile.mkdtemp(prefix="hwppdf_"))
             output_path = temp_dir / (file_path.stem + ".pdf")
 
             timeout_sec = _calculate_timeout_seconds(file_path)
-            with HwpToPdfConverter(timeout=timeout_sec) as converter:
-                converter.convert(str(file_path), str(output_path))
+            self._converter.convert(str(file_path), str(output_path), timeout=timeout_sec)
 
             if output_path.exists():
                 return {
@@ -156,6 +163,10 @@ class Api:
 
         return {"success": False, "error": "cancelled"}
 
+    def _close(self):
+        """한글 변환 스레드 종료 (밑줄로 시작해 js_api로 노출되지 않음)"""
+        self._converter.stop()
+
 
 if __name__ == "__main__":
     multiprocessing.freeze_support()
@@ -177,4 +188,5 @@ if __name__ == "__main__":
     api.set_window(window)
 
     webview.start()
+    api._close()
     sys.exit()
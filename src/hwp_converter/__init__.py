@@ -1,9 +1,11 @@
 """HWP to PDF Converter Package"""
 from .core import HwpToPdfConverter
+from .thread import HwpConversionThread
 from .exceptions import HwpConverterError, HwpInitializationError, HwpConversionError, HwpTimeoutError
 
 __all__ = [
     "HwpToPdfConverter",
+    "HwpConversionThread",
     "HwpConverterError",
     "HwpInitializationError",
     "HwpConversionError",
@@ -1,10 +1,11 @@
 ﻿"""Core HWP to PDF converter using Windows OLE Automation"""
+import ctypes
 import os
 import logging
 import subprocess
+import threading
 import time
-from pathlib import Path
-from typing import Optional
+from typing import Any, Callable, Optional
 
 from .exceptions import HwpInitializationError, HwpConversionError, HwpTimeoutError
 from .registry import ensure_security_module
@@ -12,70 +13,201 @@ from .registry import ensure_security_module
 logger = logging.getLogger(__name__)
 
 PDF_FORMAT = "PDF"
+HWP_EXTENSIONS = frozenset({".hwp", ".hwpx"})
+# str.endswith needs a tuple
+_HWP_SUFFIXES = tuple(HWP_EXTENSIONS)
+
+# PDF counts as complete once no change lands in its directory for this long
+STABLE_WINDOW = 0.25
+# Upper bound on a single notification wait, in case an event is missed
+WATCH_RECHECK_INTERVAL = 0.5
+
+# HRESULTs that mean a stuck hwp.exe rather than e.g. a missing install:
+# RPC_S_SERVER_UNAVAILABLE, RPC_E_DISCONNECTED, RPC_E_CALL_REJECTED and
+# CO_E_SERVER_EXEC_FAILURE. Matched by code since Windows localizes the text.
+FATAL_INIT_HRESULTS = frozenset({0x800706BA, 0x80010108, 0x80010001, 0x80080005})
+REGDB_E_CLASSNOTREG = 0x80040154
+# Minimum seconds between two `taskkill hwp.exe` runs in this process
+KILL_COOLDOWN = 10.0
+# Consecutive Open() misses on an extension's format before the fallback
+# format is tried first, so one odd file in a mixed batch doesn't flip it
+FORMAT_SWITCH_MISSES = 3
+
+# monotonic() may start near 0, so "never" has to be -inf
+_last_kill_ts = float("-inf")
+_kill_lock = threading.Lock()
+
+_FILE_NOTIFY_CHANGE_FILE_NAME = 0x01
+_FILE_NOTIFY_CHANGE_SIZE = 0x08
+_FILE_NOTIFY_CHANGE_LAST_WRITE = 0x10
+_WAIT_OBJECT_0 = 0
+_INVALID_HANDLE_VALUE = ctypes.c_void_p(-1).value
+
+
+class _ChangeNotification:
+    """Win32 directory change notification handle (FindFirstChangeNotification)."""
+
+    def __init__(self, kernel32, handle):
+        self._kernel32 = kernel32
+        self._handle = handle
+
+    @classmethod
+    def open(cls, directory: str) -> Optional["_ChangeNotification"]:
+        """Watch a directory for file writes; None if unsupported on this platform."""
+        windll = getattr(ctypes, "windll", None)
+        if windll is None:
+            return None
+        kernel32 = windll.kernel32
+        kernel32.FindFirstChangeNotificationW.restype = ctypes.c_void_p
+        kernel32.FindFirstChangeNotificationW.argtypes = [ctypes.c_wchar_p, ctypes.c_int, ctypes.c_ulong]
+        kernel32.FindNextChangeNotification.argtypes = [ctypes.c_void_p]
+        kernel32.FindCloseChangeNotification.argtypes = [ctypes.c_void_p]
+        kernel32.WaitForSingleObject.argtypes = [ctypes.c_void_p, ctypes.c_ulong]
+        handle = kernel32.FindFirstChangeNotificationW(
+            directory,
+            False,
+            _FILE_NOTIFY_CHANGE_FILE_NAME | _FILE_NOTIFY_CHANGE_SIZE | _FILE_NOTIFY_CHANGE_LAST_WRITE,
+        )
+        if not handle or handle == _INVALID_HANDLE_VALUE:
+            return None
+        return cls(kernel32, handle)
+
+    def wait(self, timeout: float) -> bool:
+        """Block until a change is signalled or timeout elapses; True if changed."""
+        if self._kernel32.WaitForSingleObject(self._handle, int(timeout * 1000)) != _WAIT_OBJECT_0:
+            return False
+        self._kernel32.FindNextChangeNotification(self._handle)
+        return True
+
+    def close(self) -> None:
+        self._kernel32.FindCloseChangeNotification(self._handle)
 
 
 class HwpToPdfConverter:
     """
     Converts HWP files to PDF using Hancom Office OLE Automation.
+
+    `com_factory` (ProgID -> COM object) and `pythoncom_module` default to
+    win32com's Dispatch and pythoncom; tests inject stand-ins instead.
     """
 
-    def __init__(self, timeout: int = 30, visible: bool = False):
+    _DEFAULT_FORMAT_BY_EXT = {".hwp": "HWP", ".hwpx": "HWPX"}
+
+    def __init__(
+        self,
+        timeout: int = 30,
+        visible: bool = False,
+        com_factory: Optional[Callable[[str], Any]] = None,
+        pythoncom_module: Optional[Any] = None,
+    ):
         self.timeout = timeout
         self.visible = visible
+        self._com_factory = com_factory
+        self._pythoncom = pythoncom_module
         self._hwp = None
+        # Sub-objects bound once so each conversion skips the late-bound lookups
+        self._haction = None
+        self._hfile_open_save = None
+        self._hset = None
         self._initialized = False
+        # Open() format tried first per extension ("" is HWP's auto-detect).
+        # Kept per instance: each worker thread owns its converter.
+        self._format_by_ext = dict(self._DEFAULT_FORMAT_BY_EXT)
+        self._format_misses = {}
+
+    def warm_up(self) -> None:
+        """Start HWP now so the first conversion doesn't pay for it"""
+        self._ensure_initialized()
 
     def _ensure_initialized(self) -> None:
         if self._initialized:
             return
 
-        import win32com.client
-        import pythoncom
+        if self._pythoncom is None:
+            import pythoncom
+            self._pythoncom = pythoncom
+        if self._com_factory is None:
+            import win32com.client
+            self._com_factory = win32com.client.Dispatch
 
-        pythoncom.CoInitialize()
+        self._pythoncom.CoInitialize()
         ensure_security_module()
 
         max_retries = 2
         for attempt in range(max_retries):
             try:
-                self._hwp = win32com.client.Dispatch("HWPFrame.HwpObject")
+                self._hwp = self._com_factory("HWPFrame.HwpObject")
                 self._hwp.RegisterModule("FilePathCheckDLL", "FilePathCheckerModule")
                 self._hwp.XHwpWindows.Item(0).Visible = self.visible
+                self._haction = self._hwp.HAction
+                self._hfile_open_save = self._hwp.HParameterSet.HFileOpenSave
+                self._hset = self._hfile_open_save.HSet
                 self._initialized = True
                 logger.info("HWP automation object initialized successfully")
                 return
             except Exception as e:
-                logger.warning(f"HWP initialization attempt {attempt + 1} failed: {e}")
-                self.kill_hwp_process()
+                logger.warning("HWP initialization attempt %d failed: %s", attempt + 1, e)
+                hresult = _hresult(e)
+                if hresult in FATAL_INIT_HRESULTS:
+                    self.kill_hwp_process()
                 if attempt == max_retries - 1:
                     error_msg = str(e)
-                    if "Class not registered" in error_msg:
+                    if hresult == REGDB_E_CLASSNOTREG:
                         raise HwpInitializationError(
                             "HWP is not installed or not registered for automation. "
                             "Please install Hancom Office 2020 or later."
                         ) from e
                     raise HwpInitializationError(f"Failed to initialize HWP: {error_msg}") from e
 
-    def _wait_for_output_pdf(self, output_path: Path) -> None:
+    def _wait_for_output_pdf(self, output_path: str) -> None:
         """Wait until PDF exists and file size is stable."""
-        start = time.time()
+        watcher = _ChangeNotification.open(os.path.dirname(output_path))
+        if watcher is None:
+            self._poll_for_output_pdf(output_path)
+            return
+        try:
+            self._watch_for_output_pdf(output_path, watcher)
+        finally:
+            watcher.close()
+
+    def _watch_for_output_pdf(self, output_path: str, watcher: _ChangeNotification) -> None:
+        """Wait on directory change notifications instead of fixed sleeps."""
+        deadline = time.monotonic() + self.timeout
+
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+
+            current_size = _file_size(output_path)
+            if current_size > 0:
+                # Stable once a quiet window passes without a write and the size holds
+                if not watcher.wait(min(STABLE_WINDOW, remaining)):
+                    if _file_size(output_path) == current_size:
+                        return
+            else:
+                watcher.wait(min(WATCH_RECHECK_INTERVAL, remaining))
+
+        raise HwpTimeoutError(
+            f"Timed out while waiting for PDF output (timeout={self.timeout}s): {output_path}"
+        )
+
+    def _poll_for_output_pdf(self, output_path: str) -> None:
+        """Fallback for platforms without change notifications: poll the size."""
+        deadline = time.monotonic() + self.timeout
         last_size = -1
         stable_count = 0
 
-        while time.time() - start <= self.timeout:
-            if output_path.exists():
-                try:
-                    current_size = output_path.stat().st_size
-                except OSError:
-                    current_size = -1
-
-                if current_size > 0 and current_size == last_size:
-                    stable_count += 1
-                    if stable_count >= 2:
-                        return
-                else:
-                    stable_count = 0
-                    last_size = current_size
+        while time.monotonic() <= deadline:
+            # A missing file reads as -1 and never counts as stable
+            current_size = _file_size(output_path)
+            if current_size > 0 and current_size == last_size:
+                stable_count += 1
+                if stable_count >= 2:
+                    return
+            else:
+                stable_count = 0
+                last_size = current_size
 
             time.sleep(0.5)
 
@@ -84,37 +216,55 @@ class HwpToPdfConverter:
         )
 
     def convert(self, input_path: str, output_path: Optional[str] = None) -> str:
-        input_path = Path(input_path).resolve()
+        # abspath is pure string work; resolve() would lstat every component
+        input_path = os.path.abspath(input_path)
 
-        if not input_path.exists():
-            raise FileNotFoundError(f"Input file not found: {input_path}")
+        try:
+            os.stat(input_path)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Input file not found: {input_path}") from None
 
-        if input_path.suffix.lower() not in ('.hwp', '.hwpx'):
-            raise ValueError(f"Invalid file type: {input_path.suffix}. Expected .hwp or .hwpx")
+        # Lowercase once; the same string gives the extension for the format lookup
+        lowered = input_path.lower()
+        dot = lowered.rfind(".")
+        if not lowered.endswith(_HWP_SUFFIXES):
+            raise ValueError(f"Invalid file type: {os.path.splitext(input_path)[1]}. Expected .hwp or .hwpx")
 
         if output_path is None:
-            output_path = input_path.with_suffix('.pdf')
+            output_path = input_path[:dot] + ".pdf"
         else:
-            output_path = Path(output_path).resolve()
+            output_path = os.path.abspath(output_path)
 
-        output_path.parent.mkdir(parents=True, exist_ok=True)
+        # The input's directory is known to exist, so only create other targets
+        output_dir = os.path.dirname(output_path)
+        if output_dir != os.path.dirname(input_path):
+            os.makedirs(output_dir, exist_ok=True)
         self._ensure_initialized()
 
         try:
-            logger.info(f"Opening file: {input_path}")
-
-            fmt = "HWPX" if str(input_path).lower().endswith('.hwpx') else "HWP"
-            if not self._hwp.Open(str(input_path), fmt, "forceopen:true"):
-                logger.warning(f"Failed to open with format '{fmt}', trying auto-detect")
-                if not self._hwp.Open(str(input_path), "", "forceopen:true"):
+            logger.info("Opening file: %s", input_path)
+
+            ext = lowered[dot:]
+            fmt = self._format_by_ext.get(ext, "HWP")
+            if self._hwp.Open(input_path, fmt, "forceopen:true"):
+                self._format_misses.pop(ext, None)
+            else:
+                fallback = "" if fmt else self._DEFAULT_FORMAT_BY_EXT.get(ext, "HWP")
+                logger.warning("Failed to open with format '%s', trying '%s'", fmt, fallback)
+                if not self._hwp.Open(input_path, fallback, "forceopen:true"):
                     raise HwpConversionError(f"Failed to open file: {input_path}")
-
-            logger.info(f"Saving as PDF: {output_path}")
-            self._hwp.HAction.GetDefault("FileSaveAs_S", self._hwp.HParameterSet.HFileOpenSave.HSet)
-            self._hwp.HParameterSet.HFileOpenSave.filename = str(output_path)
-            self._hwp.HParameterSet.HFileOpenSave.Format = PDF_FORMAT
-
-            if not self._hwp.HAction.Execute("FileSaveAs_S", self._hwp.HParameterSet.HFileOpenSave.HSet):
+                misses = self._format_misses.get(ext, 0) + 1
+                if misses >= FORMAT_SWITCH_MISSES:
+                    self._format_by_ext[ext] = fallback
+                    misses = 0
+                self._format_misses[ext] = misses
+
+            logger.info("Saving as PDF: %s", output_path)
+            self._haction.GetDefault("FileSaveAs_S", self._hset)
+            self._hfile_open_save.filename = output_path
+            self._hfile_open_save.Format = PDF_FORMAT
+
+            if not self._haction.Execute("FileSaveAs_S", self._hset):
                 raise HwpConversionError("Failed to save PDF")
 
             self._wait_for_output_pdf(output_path)
@@ -122,47 +272,108 @@ class HwpToPdfConverter:
             try:
                 self._hwp.Clear(1)
             except Exception as clear_err:
-                logger.warning(f"Clear() failed after save: {clear_err}")
+                logger.warning("Clear() failed after save: %s", clear_err)
 
-            logger.info(f"Conversion successful: {output_path}")
-            return str(output_path)
+            logger.info("Conversion successful: %s", output_path)
+            return output_path
 
         except (HwpConversionError, HwpTimeoutError):
             raise
         except Exception as e:
             raise HwpConversionError(f"Conversion failed: {e}") from e
 
-    def close(self) -> None:
+    def reset(self) -> None:
+        """
+        Discard the open document but keep the HWP instance for the next job.
+
+        Falls back to releasing (and killing) HWP if it no longer responds.
+        """
+        if self._hwp is None:
+            return
+        try:
+            self._hwp.Clear(1)
+        except Exception as e:
+            logger.warning("Clear() failed, releasing HWP instance: %s", e)
+            if not self.close():
+                self.kill_hwp_process()
+
+    def close(self) -> bool:
+        """Quit HWP and release COM; returns False if Quit() itself failed."""
+        quit_ok = True
         if self._hwp is not None:
             try:
                 self._hwp.Quit()
             except Exception as e:
-                logger.warning(f"Error while closing HWP: {e}")
+                quit_ok = False
+                logger.warning("Error while closing HWP: %s", e)
             finally:
                 self._hwp = None
+                self._haction = None
+                self._hfile_open_save = None
+                self._hset = None
                 self._initialized = False
                 try:
-                    import pythoncom
-                    pythoncom.CoUninitialize()
+                    self._pythoncom.CoUninitialize()
                 except Exception:
                     pass
                 logger.info("HWP resources released")
+        return quit_ok
 
     def kill_hwp_process(self) -> None:
+        global _last_kill_ts
+        with _kill_lock:
+            now = time.monotonic()
+            if now - _last_kill_ts < KILL_COOLDOWN:
+                logger.info("Skipping hwp.exe kill, one ran moments ago")
+                return
+            _last_kill_ts = now
         try:
             subprocess.run(
                 ["taskkill", "/F", "/IM", "hwp.exe"],
-                capture_output=True,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
                 timeout=5
             )
             logger.info("Killed hwp.exe process")
         except Exception as e:
-            logger.warning(f"Failed to kill hwp.exe: {e}")
+            logger.warning("Failed to kill hwp.exe: %s", e)
 
     def __enter__(self) -> "HwpToPdfConverter":
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb) -> None:
-        self.close()
-        if exc_type is not None:
+        # A clean Quit() means HWP is gone; only force-kill one that hung
+        if not self.close() and exc_type is not None:
             self.kill_hwp_process()
+
+
+def preload_com_modules() -> bool:
+    """
+    Import pywin32 ahead of the first conversion.
+
+    HwpToPdfConverter imports it lazily so the package still loads where
+    pywin32 is missing; preloading moves that cost to startup. Returns
+    False if pywin32 is not installed.
+    """
+    try:
+        import pythoncom  # noqa: F401
+        import win32com.client  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _hresult(error: Exception) -> Optional[int]:
+    """Unsigned HRESULT of a pywin32 com_error, or None for other errors."""
+    code = error.args[0] if error.args else None
+    if isinstance(code, int):
+        return code & 0xFFFFFFFF
+    return None
+
+
+def _file_size(path: str) -> int:
+    """Size of a file in bytes, or -1 if it does not exist (yet)."""
+    try:
+        return os.stat(path).st_size
+    except OSError:
+        return -1
@@ -1,6 +1,8 @@
 """Registry utilities for HWP security module configuration"""
+import threading
 import winreg
 import logging
+from typing import Optional
 
 logger = logging.getLogger(__name__)
 
@@ -8,16 +10,34 @@ logger = logging.getLogger(__name__)
 HANCOM_REGISTRY_PATH = r"SOFTWARE\HNC\HwpAutomation\Modules"
 SECURITY_MODULE_NAME = "FilePathCheckerModule"
 
+# In-process cache of the registration check, so long-running workers
+# don't reopen the registry key for every conversion
+_SEC_MODULE_CACHE: Optional[bool] = None
+_SEC_MODULE_LOCK = threading.Lock()
+
 
 def check_security_module_registered() -> bool:
     """
     Check if the FilePathCheckerModule is registered in the registry.
     
+    The result is cached for the lifetime of the process.
+    
     Returns:
         True if the module is registered, False otherwise.
     """
+    global _SEC_MODULE_CACHE
+    with _SEC_MODULE_LOCK:
+        if _SEC_MODULE_CACHE is None:
+            _SEC_MODULE_CACHE = _query_security_module()
+        return _SEC_MODULE_CACHE
+
+
+def _query_security_module() -> bool:
+    """Read the security module value from the registry"""
     try:
-        with winreg.OpenKey(winreg.HKEY_CURRENT_USER, HANCOM_REGISTRY_PATH) as key:
+        with winreg.OpenKey(
+            winreg.HKEY_CURRENT_USER, HANCOM_REGISTRY_PATH, 0, winreg.KEY_READ
+        ) as key:
             try:
                 winreg.QueryValueEx(key, SECURITY_MODULE_NAME)
                 return True
@@ -26,7 +46,7 @@ def check_security_module_registered() -> bool:
     except FileNotFoundError:
         return False
     except Exception as e:
-        logger.warning(f"Failed to check registry: {e}")
+        logger.warning("Failed to check registry: %s", e)
         return False
 
 
@@ -39,17 +59,22 @@ def register_security_module() -> bool:
     Returns:
         True if registration succeeded, False otherwise.
     """
+    global _SEC_MODULE_CACHE
     try:
         # Create key path if it doesn't exist
-        with winreg.CreateKey(winreg.HKEY_CURRENT_USER, HANCOM_REGISTRY_PATH) as key:
+        with winreg.CreateKeyEx(
+            winreg.HKEY_CURRENT_USER, HANCOM_REGISTRY_PATH, 0, winreg.KEY_SET_VALUE
+        ) as key:
             winreg.SetValueEx(key, SECURITY_MODULE_NAME, 0, winreg.REG_SZ, "FilePathCheckerModule")
             logger.info("Security module registered successfully")
-            return True
+        with _SEC_MODULE_LOCK:
+            _SEC_MODULE_CACHE = True
+        return True
     except PermissionError:
         logger.error("Permission denied: Run as administrator to register security module")
         return False
     except Exception as e:
-        logger.error(f"Failed to register security module: {e}")
+        logger.error("Failed to register security module: %s", e)
         return False
 
 
@@ -57,6 +82,8 @@ def ensure_security_module() -> None:
     """
     Ensure the security module is registered. Register if not present.
     """
+    if _SEC_MODULE_CACHE:
+        return
     if not check_security_module_registered():
         logger.info("Security module not found, attempting to register...")
         if not register_security_module():
@@ -0,0 +1,76 @@
+"""Dedicated COM thread that owns a long-lived HWP converter"""
+import logging
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Optional
+
+from .core import HwpToPdfConverter
+
+logger = logging.getLogger(__name__)
+
+
+class HwpConversionThread:
+    """
+    Runs all conversions on a single COM STA thread.
+
+    The HWP automation object is created once on this thread and reused for
+    every job, instead of paying COM initialization and Dispatch per file.
+    Callers on any thread submit work and wait on the returned future.
+    """
+
+    def __init__(self, visible: bool = False):
+        self.visible = visible
+        self._queue: queue.Queue = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        """Start the conversion thread if it is not running yet"""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="hwp-com", daemon=True)
+            self._thread.start()
+
+    def submit(self, input_path: str, output_path: Optional[str] = None, timeout: int = 30) -> Future:
+        """Queue a conversion and return a future resolving to the PDF path"""
+        self.start()
+        future: Future = Future()
+        self._queue.put((input_path, output_path, timeout, future))
+        return future
+
+    def convert(self, input_path: str, output_path: Optional[str] = None, timeout: int = 30) -> str:
+        """Convert a file on the COM thread and wait for the result"""
+        return self.submit(input_path, output_path, timeout).result()
+
+    def stop(self) -> None:
+        """Release the HWP instance and stop the thread after queued work"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join()
+
+    def _run(self) -> None:
+        converter = HwpToPdfConverter(visible=self.visible)
+        try:
+            while True:
+                item = self._queue.get()
+                if item is None:
+                    return
+                input_path, output_path, timeout, future = item
+                if not future.set_running_or_notify_cancel():
+                    continue
+                converter.timeout = timeout
+                try:
+                    future.set_result(converter.convert(input_path, output_path))
+                except Exception as e:
+                    future.set_exception(e)
+                    # Drop the HWP instance so the next job starts from a fresh
+                    # one, killing it only if it no longer quits
+                    if not converter.close():
+                        converter.kill_hwp_process()
+        finally:
+            converter.close()
+            logger.info("HWP conversion thread stopped")
@@ -1,34 +1,51 @@
 import subprocess
 import os
 from pathlib import Path
+from typing import List, Optional
 
 
 from .utils import get_libreoffice_path
 
+# Seconds before a hung soffice run is killed; generous because a fresh
+# profile is built on a converter's first run
+SOFFICE_TIMEOUT = 120
+
 class OdtConversionError(Exception):
     pass
 
 class OdtToPdfConverter:
+    def __init__(self, profile_dir: Optional[str] = None, timeout: float = SOFFICE_TIMEOUT):
+        """
+        Args:
+            profile_dir: LibreOffice user profile directory for this converter.
+                soffice processes sharing a profile block on its lock, so
+                converters used concurrently each need their own.
+            timeout: Seconds one soffice run may take before it is killed.
+        """
+        self.profile_dir = profile_dir
+        self.timeout = timeout
+        self._profile_args = (
+            [f"-env:UserInstallation={Path(os.path.abspath(profile_dir)).as_uri()}"]
+            if profile_dir else []
+        )
+
     def convert(self, input_path: str, output_path: str) -> str:
-        input_file = Path(input_path)
-        output_file = Path(output_path)
-        output_dir = output_file.parent
-        
-        libreoffice_cmd = get_libreoffice_path()
-        if not libreoffice_cmd:
-             raise OdtConversionError("LibreOffice/soffice executable not found in PATH or standard locations")
+        input_file = os.fspath(input_path)
+        output_file = os.fspath(output_path)
+        # A bare file name has no directory part; soffice needs "." spelled out
+        output_dir = os.path.dirname(output_file) or "."
+        stem = os.path.splitext(os.path.basename(input_file))[0]
 
         # LibreOffice command
         # libreoffice --headless --convert-to pdf --outdir <dir> <input>
         # Note: LibreOffice output filename is determined by input filename.
         # We might need to rename it if output_path has a different name.
         
-        cmd = [
-            libreoffice_cmd, 
+        args = [
             "--headless", 
             "--convert-to", "pdf", 
-            "--outdir", str(output_dir), 
-            str(input_file)
+            "--outdir", output_dir, 
+            input_file
         ]
         
         try:
@@ -36,27 +53,59 @@ class OdtToPdfConverter:
             # Users often have 'soffice' or full path.
             # We use the detected path.
             
-            subprocess.run(cmd, check=True, capture_output=True)
+            self._run_soffice(args)
             
             # Expected output file
-            expected_output = output_dir / (input_file.stem + ".pdf")
+            expected_output = os.path.join(output_dir, stem + ".pdf")
             
-            if not expected_output.exists():
-                 # Try 'soffice' if libreoffice failed (though check=True would catch it if command not found?)
-                 # Actually subprocess would raise FileNotFoundError if executable is missing.
-                 raise OdtConversionError("Output PDF not found after conversion")
+            if not os.path.exists(expected_output):
+                # A missing executable already raised FileNotFoundError in _run_soffice
+                raise OdtConversionError("Output PDF not found after conversion")
                  
             # Rename if necessary (if requested output name is different)
+            # os.replace overwrites an existing target atomically
             if expected_output != output_file:
-                if output_file.exists():
-                    output_file.unlink()
-                expected_output.rename(output_file)
+                os.replace(expected_output, output_file)
                 
-            return str(output_file)
+            return output_file
 
-        except subprocess.CalledProcessError as e:
-            raise OdtConversionError(f"LibreOffice conversion failed: {e.stderr.decode()}")
+        except (OdtConversionError, subprocess.TimeoutExpired):
+            raise
         except FileNotFoundError:
-             raise OdtConversionError("LibreOffice/soffice executable not found in PATH")
+            raise OdtConversionError("LibreOffice/soffice executable not found in PATH")
         except Exception as e:
             raise OdtConversionError(f"Unexpected error: {str(e)}")
+
+    def _run_soffice(self, args: List[str]) -> None:
+        """
+        Run soffice from the cached executable path.
+
+        If the cached path has gone away (LibreOffice moved or reinstalled),
+        the lookup is redone once before giving up. A run that outlasts the
+        timeout is killed and raises subprocess.TimeoutExpired.
+        """
+        for retry in (False, True):
+            libreoffice_cmd = get_libreoffice_path()
+            if not libreoffice_cmd:
+                # Don't remember a miss; LibreOffice may be installed later
+                get_libreoffice_path.cache_clear()
+                raise OdtConversionError("LibreOffice/soffice executable not found in PATH or standard locations")
+            try:
+                result = subprocess.run(
+                    [libreoffice_cmd, *self._profile_args, *args],
+                    check=False,
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.PIPE,
+                    timeout=self.timeout,
+                )
+            except FileNotFoundError:
+                if retry:
+                    raise
+                get_libreoffice_path.cache_clear()
+                continue
+            if result.returncode != 0:
+                # stderr is only decoded when there is an error to report
+                raise OdtConversionError(
+                    f"LibreOffice conversion failed: {result.stderr.decode(errors='replace')}"
+                )
+            return
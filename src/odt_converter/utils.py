@@ -1,12 +1,16 @@
+import functools
 import shutil
 import os
 from pathlib import Path
 from typing import Optional
 
+@functools.lru_cache(maxsize=1)
 def get_libreoffice_path() -> Optional[str]:
     """
     Find the LibreOffice executable (soffice).
     Checks PATH first, then common Windows installation directories.
+
+    The result is cached; call get_libreoffice_path.cache_clear() to look again.
     """
     # 1. Check PATH
     # 'libreoffice' is common on Linux, 'soffice' on Windows/Mac
@@ -0,0 +1,21 @@
+"""Shared pytest fixtures"""
+import pytest
+from fastapi.testclient import TestClient
+
+from api import routes
+from api.main import app
+
+
+@pytest.fixture(scope="session")
+def client():
+    """Create one test client for the whole session"""
+    return TestClient(app)
+
+
+@pytest.fixture(autouse=True)
+def storage_dir(tmp_path, monkeypatch):
+    """Write job directories under tmp_path instead of the real storage root"""
+    storage = tmp_path / "storage"
+    storage.mkdir()
+    monkeypatch.setattr(routes, "STORAGE_DIR_STR", str(storage))
+    return storage
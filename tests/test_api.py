@@ -1,9 +1,7 @@
 """API endpoint tests using FastAPI TestClient"""
 import pytest
+from datetime import datetime
 from pathlib import Path
-from fastapi.testclient import TestClient
-
-from api.main import app
 from api.queue import job_queue
 from api.models import JobStatus
 
@@ -16,12 +14,6 @@ def clear_queue():
     job_queue.clear()
 
 
-@pytest.fixture
-def client():
-    """Create test client"""
-    return TestClient(app)
-
-
 @pytest.fixture
 def sample_hwp_file(tmp_path):
     """Create a sample HWP file for testing"""
@@ -88,6 +80,21 @@ class TestUploadEndpoint:
         
         assert job is not None
         assert Path(job.source_path).exists()
+    
+    def test_upload_saves_large_file_intact(self, client, tmp_path):
+        """Test that uploads spanning several chunks are saved byte-for-byte"""
+        content = bytes(range(256)) * 10000
+        hwp_file = tmp_path / "large.hwp"
+        hwp_file.write_bytes(content)
+        
+        with open(hwp_file, "rb") as f:
+            response = client.post(
+                "/api/upload",
+                files={"file": ("large.hwp", f, "application/octet-stream")}
+            )
+        
+        job = job_queue.get_job(response.json()["job_id"])
+        assert Path(job.source_path).read_bytes() == content
 
 
 class TestStatusEndpoint:
@@ -111,6 +118,35 @@ class TestStatusEndpoint:
         assert data["job_id"] == job_id
         assert data["status"] == "pending"
         assert data["source_filename"] == "test.hwp"
+        assert data["completed_at"] is None
+    
+    def test_get_status_completed(self, client, tmp_path):
+        """Test status check reports completion time for finished jobs"""
+        job = job_queue.add_job("test.hwp", str(tmp_path / "test.hwp"))
+        job_queue.update_status(job.job_id, JobStatus.FAILED, error="boom")
+        
+        response = client.get(f"/api/status/{job.job_id}")
+        data = response.json()
+        assert data["status"] == "failed"
+        assert data["error"] == "boom"
+        assert datetime.fromisoformat(data["completed_at"]) >= datetime.fromisoformat(data["created_at"])
+    
+    def test_get_status_not_modified(self, client, tmp_path):
+        """Test status polls with a matching ETag get an empty 304"""
+        job = job_queue.add_job("test.hwp", str(tmp_path / "test.hwp"))
+        
+        first = client.get(f"/api/status/{job.job_id}")
+        etag = first.headers["etag"]
+        
+        second = client.get(f"/api/status/{job.job_id}", headers={"If-None-Match": etag})
+        assert second.status_code == 304
+        assert second.content == b""
+        
+        job_queue.update_status(job.job_id, JobStatus.PROCESSING)
+        third = client.get(f"/api/status/{job.job_id}", headers={"If-None-Match": etag})
+        assert third.status_code == 200
+        assert third.json()["status"] == "processing"
+        assert third.headers["etag"] != etag
     
     def test_get_status_not_found(self, client):
         """Test status check for non-existent job"""
@@ -133,12 +169,80 @@ class TestDownloadEndpoint:
         response = client.get(f"/api/download/{job_id}")
         assert response.status_code == 202
     
+    def test_download_completed_job(self, client, tmp_path):
+        """Test download returns the PDF once the job is completed"""
+        pdf_file = tmp_path / "output.pdf"
+        pdf_file.write_bytes(b"%PDF-mock")
+        job = job_queue.add_job("test.hwp", str(tmp_path / "test.hwp"))
+        job_queue.update_status(job.job_id, JobStatus.COMPLETED, output_path=str(pdf_file))
+        
+        response = client.get(f"/api/download/{job.job_id}")
+        assert response.status_code == 200
+        assert response.content == b"%PDF-mock"
+    
+    def test_download_uses_xaccel_redirect(self, client, monkeypatch):
+        """Test download is delegated to nginx when X-Accel-Redirect is enabled"""
+        from api import routes
+        
+        monkeypatch.setattr(routes, "USE_XACCEL", True)
+        job = job_queue.add_job("보고서.hwp", "")
+        job_dir = Path(routes.get_job_dir(job.job_id))
+        job_dir.mkdir(parents=True, exist_ok=True)
+        pdf_file = job_dir / "output.pdf"
+        pdf_file.write_bytes(b"%PDF-mock")
+        job_queue.update_status(job.job_id, JobStatus.COMPLETED, output_path=str(pdf_file))
+        
+        response = client.get(f"/api/download/{job.job_id}")
+        assert response.status_code == 200
+        assert response.content == b""
+        assert response.headers["x-accel-redirect"] == f"/protected/{job.job_id}/output.pdf"
+        assert response.headers["content-disposition"].startswith("attachment; filename*=utf-8''")
+    
+    def test_download_outside_job_dir_skips_xaccel(self, client, monkeypatch, tmp_path):
+        """An output nginx cannot map is streamed by the app instead"""
+        from api import routes
+        
+        monkeypatch.setattr(routes, "USE_XACCEL", True)
+        job = job_queue.add_job("report.hwp", "")
+        pdf_file = tmp_path / "elsewhere.pdf"
+        pdf_file.write_bytes(b"%PDF-mock")
+        job_queue.update_status(job.job_id, JobStatus.COMPLETED, output_path=str(pdf_file))
+        
+        response = client.get(f"/api/download/{job.job_id}")
+        assert response.status_code == 200
+        assert response.content == b"%PDF-mock"
+        assert "x-accel-redirect" not in response.headers
+    
+    def test_download_missing_output_returns_500(self, client, tmp_path):
+        """Test download fails when the worker never produced the PDF"""
+        job = job_queue.add_job("test.hwp", str(tmp_path / "test.hwp"))
+        job_queue.update_status(
+            job.job_id, JobStatus.COMPLETED, output_path=str(tmp_path / "missing.pdf")
+        )
+        
+        response = client.get(f"/api/download/{job.job_id}")
+        assert response.status_code == 500
+    
     def test_download_not_found(self, client):
         """Test download for non-existent job"""
         response = client.get("/api/download/nonexistent-job-id")
         assert response.status_code == 404
 
 
+class TestJobsEndpoint:
+    """Tests for GET /api/jobs"""
+    
+    def test_list_jobs_serialises_timestamps(self, client):
+        """Test that job timestamps are exposed as ISO datetimes"""
+        job = job_queue.add_job("test.hwp", "/tmp/test.hwp")
+        
+        response = client.get("/api/jobs")
+        assert response.status_code == 200
+        data = response.json()
+        assert [j["job_id"] for j in data] == [job.job_id]
+        assert datetime.fromisoformat(data[0]["created_at"]).timestamp() == pytest.approx(job.created_at)
+
+
 class TestHealthEndpoint:
     """Tests for health check"""
     
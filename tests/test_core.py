@@ -5,7 +5,7 @@ from pathlib import Path
 import os
 
 from src.hwp_converter.core import HwpToPdfConverter
-from src.hwp_converter.exceptions import HwpConversionError
+from src.hwp_converter.exceptions import HwpConversionError, HwpInitializationError
 
 class TestHwpToPdfConverter:
     """Tests for HwpToPdfConverter class with targeted patching"""
@@ -28,41 +28,25 @@ class TestHwpToPdfConverter:
             return True
         self.mock_hwp.HAction.Execute.side_effect = side_effect_execute
 
-        # 2. 패치 대상 설정
-        # core.py 내부의 win32com.client.gencache.EnsureDispatch를 패치해야 함
-        # 하지만 core.py가 import를 함수 안에서 하므로, sys.modules를 패치하는 것이 가장 확실함
-        
-        import sys
-        mock_win32 = MagicMock()
-        mock_win32.client.gencache.EnsureDispatch.return_value = self.mock_hwp
-        
-        mock_pythoncom = MagicMock()
-
-        patches = [
-            patch.dict(sys.modules, {
-                'win32com': mock_win32,
-                'win32com.client': mock_win32.client,
-                'win32com.client.gencache': mock_win32.client.gencache,
-                'pythoncom': mock_pythoncom
-            }),
-            patch('src.hwp_converter.registry.ensure_security_module', return_value=None),
-            patch('src.hwp_converter.registry.check_security_module_registered', return_value=True)
-        ]
-
-        for p in patches:
-            p.start()
-        
-        yield
-        
-        for p in patches:
-            p.stop()
+        # 2. COM 팩토리와 pythoncom은 생성자로 주입하므로 sys.modules 패치가 필요 없음
+        self.mock_pythoncom = MagicMock()
+
+        with patch('src.hwp_converter.core.ensure_security_module', return_value=None):
+            yield
+
+    def make_converter(self, **kwargs):
+        return HwpToPdfConverter(
+            com_factory=lambda progid: self.mock_hwp,
+            pythoncom_module=self.mock_pythoncom,
+            **kwargs
+        )
 
     def test_convert_success(self, tmp_path):
         hwp_file = tmp_path / "test.hwp"
         hwp_file.write_text("content")
         pdf_path = tmp_path / "output.pdf"
         
-        converter = HwpToPdfConverter()
+        converter = self.make_converter()
         result = converter.convert(str(hwp_file), str(pdf_path))
         
         assert result == str(pdf_path)
@@ -75,7 +59,7 @@ class TestHwpToPdfConverter:
         hwp_file.write_text("content")
         self.mock_hwp.Open.return_value = False
         
-        converter = HwpToPdfConverter()
+        converter = self.make_converter()
         with pytest.raises(HwpConversionError, match="Failed to open file"):
             converter.convert(str(hwp_file))
         converter.close()
@@ -84,31 +68,236 @@ class TestHwpToPdfConverter:
         hwp_file = tmp_path / "test.hwp"
         hwp_file.write_text("content")
         
-        converter = HwpToPdfConverter()
+        converter = self.make_converter()
         converter.convert(str(hwp_file))
         converter.close()
         
         self.mock_hwp.Quit.assert_called_once()
+        self.mock_pythoncom.CoInitialize.assert_called_once()
+        self.mock_pythoncom.CoUninitialize.assert_called_once()
 
     def test_context_manager(self, tmp_path):
         hwp_file = tmp_path / "test.hwp"
         hwp_file.write_text("content")
         
-        with HwpToPdfConverter() as converter:
+        with self.make_converter() as converter:
             converter.convert(str(hwp_file))
             assert converter._hwp is not None
         
         assert converter._hwp is None
         self.mock_hwp.Quit.assert_called_once()
 
+    def test_convert_remembers_format_that_opened(self, tmp_path):
+        hwp_file = tmp_path / "test.hwp"
+        hwp_file.write_text("content")
+        self.mock_hwp.Open.side_effect = lambda path, fmt, arg: fmt == ""
+
+        with patch("src.hwp_converter.core.FORMAT_SWITCH_MISSES", 2):
+            converter = self.make_converter()
+            for _ in range(3):
+                converter.convert(str(hwp_file))
+            converter.close()
+
+        formats = [c.args[1] for c in self.mock_hwp.Open.call_args_list]
+        assert formats == ["HWP", "", "HWP", "", ""]
+
+    def test_convert_keeps_format_after_isolated_miss(self, tmp_path):
+        hwp_file = tmp_path / "test.hwp"
+        hwp_file.write_text("content")
+        # Every other file only opens with auto-detect
+        results = iter([False, True, True, False, True, True])
+        self.mock_hwp.Open.side_effect = lambda path, fmt, arg: next(results)
+
+        with patch("src.hwp_converter.core.FORMAT_SWITCH_MISSES", 2):
+            converter = self.make_converter()
+            for _ in range(4):
+                converter.convert(str(hwp_file))
+            converter.close()
+
+        formats = [c.args[1] for c in self.mock_hwp.Open.call_args_list]
+        assert formats == ["HWP", "", "HWP", "HWP", "", "HWP"]
+
+    def test_convert_accepts_uppercase_extension(self, tmp_path):
+        hwp_file = tmp_path / "TEST.HWPX"
+        hwp_file.write_text("content")
+
+        converter = self.make_converter()
+        converter.convert(str(hwp_file))
+        converter.close()
+
+        assert self.mock_hwp.Open.call_args.args[1] == "HWPX"
+
+    def test_convert_creates_missing_output_dir(self, tmp_path):
+        hwp_file = tmp_path / "test.hwp"
+        hwp_file.write_text("content")
+        pdf_path = tmp_path / "nested" / "out" / "output.pdf"
+
+        converter = self.make_converter()
+        assert converter.convert(str(hwp_file), str(pdf_path)) == str(pdf_path)
+        assert pdf_path.exists()
+        converter.close()
+
+    def test_reset_clears_document_and_keeps_hwp(self):
+        converter = self.make_converter()
+        converter._hwp = self.mock_hwp
+        converter._initialized = True
+
+        converter.reset()
+
+        self.mock_hwp.Clear.assert_called_once_with(1)
+        self.mock_hwp.Quit.assert_not_called()
+        assert converter._hwp is self.mock_hwp
+
+    def test_reset_releases_unresponsive_hwp(self):
+        converter = self.make_converter()
+        converter._hwp = self.mock_hwp
+        converter._initialized = True
+        self.mock_hwp.Clear.side_effect = Exception("RPC server unavailable")
+        self.mock_hwp.Quit.side_effect = Exception("RPC server unavailable")
+
+        with patch.object(converter, "kill_hwp_process") as mock_kill:
+            converter.reset()
+
+        assert converter._hwp is None
+        mock_kill.assert_called_once()
+
+    def test_context_manager_skips_kill_after_clean_quit(self, tmp_path):
+        converter = self.make_converter()
+        with patch.object(converter, "kill_hwp_process") as mock_kill:
+            with pytest.raises(RuntimeError):
+                with converter:
+                    converter._hwp = self.mock_hwp
+                    raise RuntimeError("boom")
+            mock_kill.assert_not_called()
+
+            self.mock_hwp.Quit.side_effect = Exception("RPC server unavailable")
+            with pytest.raises(RuntimeError):
+                with converter:
+                    converter._hwp = self.mock_hwp
+                    raise RuntimeError("boom")
+            mock_kill.assert_called_once()
+
+    def test_kill_is_rate_limited(self):
+        with patch("src.hwp_converter.core._last_kill_ts", float("-inf")), \
+                patch("src.hwp_converter.core.subprocess.run") as mock_run:
+            self.make_converter().kill_hwp_process()
+            self.make_converter().kill_hwp_process()
+
+        mock_run.assert_called_once()
+
+    @pytest.mark.parametrize("hresult, killed", [
+        (-2147023174, True),   # RPC_S_SERVER_UNAVAILABLE
+        (-2147221005, False),  # CO_E_CLASSSTRING
+    ])
+    def test_init_kills_hwp_only_on_fatal_hresult(self, hresult, killed):
+        def com_factory(progid):
+            # com_error args: (hresult, localized message, excepinfo, argerror)
+            raise Exception(hresult, "잘못된 클래스 문자열입니다.", None, None)
+
+        converter = HwpToPdfConverter(com_factory=com_factory, pythoncom_module=self.mock_pythoncom)
+        with patch.object(converter, "kill_hwp_process") as mock_kill:
+            with pytest.raises(HwpInitializationError):
+                converter.warm_up()
+
+        assert mock_kill.called == killed
+
     def test_file_not_found(self):
-        converter = HwpToPdfConverter()
+        converter = self.make_converter()
         with pytest.raises(FileNotFoundError):
             converter.convert("non_existent.hwp")
 
     def test_invalid_extension(self, tmp_path):
         bad_file = tmp_path / "test.txt"
         bad_file.write_text("bad")
-        converter = HwpToPdfConverter()
+        converter = self.make_converter()
         with pytest.raises(ValueError, match="Invalid file type"):
             converter.convert(str(bad_file))
+
+
+class TestWaitForOutputPdf:
+    """Tests for waiting on the PDF written by HWP"""
+
+    class FakeWatcher:
+        def __init__(self, events):
+            self.events = list(events)
+            self.closed = False
+
+        def wait(self, timeout):
+            return self.events.pop(0) if self.events else False
+
+        def close(self):
+            self.closed = True
+
+    def test_returns_after_quiet_window(self, tmp_path):
+        pdf = tmp_path / "out.pdf"
+        pdf.write_bytes(b"%PDF-mock")
+        watcher = self.FakeWatcher([True])
+
+        with patch("src.hwp_converter.core._ChangeNotification.open", return_value=watcher):
+            HwpToPdfConverter(timeout=5)._wait_for_output_pdf(pdf)
+
+        assert watcher.closed
+        assert not watcher.events
+
+    def test_times_out_when_pdf_never_appears(self, tmp_path):
+        from src.hwp_converter.exceptions import HwpTimeoutError
+
+        watcher = self.FakeWatcher([])
+        with patch("src.hwp_converter.core._ChangeNotification.open", return_value=watcher):
+            with pytest.raises(HwpTimeoutError):
+                HwpToPdfConverter(timeout=0.2)._wait_for_output_pdf(tmp_path / "missing.pdf")
+
+        assert watcher.closed
+
+    def test_falls_back_to_polling(self, tmp_path):
+        pdf = tmp_path / "out.pdf"
+        pdf.write_bytes(b"%PDF-mock")
+
+        with patch("src.hwp_converter.core._ChangeNotification.open", return_value=None), \
+                patch("src.hwp_converter.core.time.sleep") as mock_sleep:
+            HwpToPdfConverter(timeout=5)._wait_for_output_pdf(pdf)
+
+        assert mock_sleep.call_count == 2
+
+
+class TestHwpConversionThread:
+    """Tests for the dedicated HWP COM thread"""
+
+    @pytest.fixture
+    def mock_converter(self):
+        with patch('src.hwp_converter.thread.HwpToPdfConverter') as mock_cls:
+            yield mock_cls
+
+    def test_reuses_one_converter_on_one_thread(self, mock_converter):
+        import threading
+        from src.hwp_converter.thread import HwpConversionThread
+
+        threads = []
+        def convert(input_path, output_path):
+            threads.append(threading.current_thread().name)
+            return output_path
+        mock_converter.return_value.convert.side_effect = convert
+
+        worker = HwpConversionThread()
+        assert worker.convert("a.hwp", "a.pdf", timeout=10) == "a.pdf"
+        assert worker.convert("b.hwp", "b.pdf", timeout=20) == "b.pdf"
+        worker.stop()
+
+        mock_converter.assert_called_once()
+        assert threads == ["hwp-com", "hwp-com"]
+        assert mock_converter.return_value.timeout == 20
+        mock_converter.return_value.close.assert_called()
+
+    def test_failure_is_raised_to_caller_and_resets_hwp(self, mock_converter):
+        from src.hwp_converter.thread import HwpConversionThread
+
+        mock_converter.return_value.convert.side_effect = HwpConversionError("boom")
+        # Quit() hangs, so the instance has to be killed
+        mock_converter.return_value.close.return_value = False
+
+        worker = HwpConversionThread()
+        with pytest.raises(HwpConversionError, match="boom"):
+            worker.convert("a.hwp", "a.pdf")
+        worker.stop()
+
+        mock_converter.return_value.kill_hwp_process.assert_called_once()
@@ -5,8 +5,6 @@ from pathlib import Path
 from unittest.mock import patch, MagicMock
 import sys
 
-from fastapi.testclient import TestClient
-from api.main import app
 from api.queue import job_queue
 from api.models import JobStatus
 
@@ -19,11 +17,6 @@ def clear_queue():
     job_queue.clear()
 
 
-@pytest.fixture
-def client():
-    return TestClient(app)
-
-
 @pytest.fixture
 def sample_hwp(tmp_path):
     hwp_file = tmp_path / "test.hwp"
@@ -31,12 +24,29 @@ def sample_hwp(tmp_path):
     return hwp_file
 
 
+@pytest.fixture(scope="module")
+def com_mocks():
+    """Install the COM module mocks once for the whole module"""
+    mock_hwp = MagicMock()
+    
+    mock_win32 = MagicMock()
+    mock_win32.client.Dispatch.return_value = mock_hwp
+    
+    with patch.dict(sys.modules, {
+        'win32com': mock_win32,
+        'win32com.client': mock_win32.client,
+        'pythoncom': MagicMock()
+    }):
+        with patch('src.hwp_converter.core.ensure_security_module'):
+            yield mock_hwp
+
+
 @pytest.fixture
-def mock_converter():
+def mock_converter(com_mocks):
     """Mock the HWP converter to simulate successful conversion"""
-    mock_hwp = MagicMock()
+    mock_hwp = com_mocks
+    mock_hwp.reset_mock()
     mock_hwp.Open.return_value = True
-    mock_hwp.HAction.Execute.return_value = True
     
     def mock_execute(action, hset):
         if action == "FileSaveAs_S":
@@ -47,18 +57,7 @@ def mock_converter():
         return True
     
     mock_hwp.HAction.Execute.side_effect = mock_execute
-    
-    mock_win32 = MagicMock()
-    mock_win32.client.gencache.EnsureDispatch.return_value = mock_hwp
-    
-    with patch.dict(sys.modules, {
-        'win32com': mock_win32,
-        'win32com.client': mock_win32.client,
-        'win32com.client.gencache': mock_win32.client.gencache,
-        'pythoncom': MagicMock()
-    }):
-        with patch('src.hwp_converter.registry.ensure_security_module'):
-            yield mock_hwp
+    return mock_hwp
 
 
 class TestJobStateTransitions:
@@ -111,6 +110,124 @@ class TestJobStateTransitions:
         updated_job = job_queue.get_job(job.job_id)
         assert updated_job.status == JobStatus.FAILED
         assert updated_job.error is not None
+    
+    def test_missing_source_fails_without_traceback(self, caplog):
+        """A missing source file is a routine failure logged as a warning"""
+        from worker.processor import ConversionWorker
+        
+        job = job_queue.add_job("test.hwp", "/nonexistent/file.hwp")
+        
+        with caplog.at_level("WARNING", logger="worker.processor"):
+            ConversionWorker()._process_job(job)
+        
+        updated_job = job_queue.get_job(job.job_id)
+        assert updated_job.status == JobStatus.FAILED
+        assert updated_job.error.startswith("Input file not found")
+        record = next(r for r in caplog.records if r.name == "worker.processor")
+        assert record.levelname == "WARNING"
+        assert record.exc_info is None
+
+    def test_worker_reuses_hwp_converter_across_jobs(self, tmp_path):
+        """Jobs on the same thread share one HWP converter"""
+        from worker.processor import ConversionWorker
+        
+        with patch('worker.processor.HwpToPdfConverter') as mock_cls:
+            mock_cls.return_value.convert.side_effect = lambda src, out: out
+            worker = ConversionWorker()
+            for name in ("a.hwp", "b.hwp"):
+                source = tmp_path / name
+                source.write_text("HWP content")
+                worker._process_job(job_queue.add_job(name, str(source)))
+        
+        mock_cls.assert_called_once()
+        assert mock_cls.return_value.convert.call_count == 2
+        mock_cls.return_value.close.assert_not_called()
+
+    def test_worker_replaces_hwp_converter_after_timeout(self, tmp_path):
+        """A hung HWP instance is discarded instead of reused"""
+        from worker.processor import ConversionWorker
+        from src.hwp_converter import HwpTimeoutError
+        
+        with patch('worker.processor.HwpToPdfConverter') as mock_cls:
+            mock_cls.return_value.convert.side_effect = [HwpTimeoutError("stuck"), "out.pdf"]
+            mock_cls.return_value.close.return_value = True
+            worker = ConversionWorker()
+            jobs = []
+            for name in ("a.hwp", "b.hwp"):
+                source = tmp_path / name
+                source.write_text("HWP content")
+                jobs.append(job_queue.add_job(name, str(source)))
+                worker._process_job(jobs[-1])
+        
+        assert mock_cls.call_count == 2
+        mock_cls.return_value.close.assert_called_once()
+        mock_cls.return_value.reset.assert_not_called()
+        assert job_queue.get_job(jobs[0].job_id).status == JobStatus.FAILED
+        assert job_queue.get_job(jobs[1].job_id).status == JobStatus.COMPLETED
+
+    def test_worker_collects_garbage_periodically(self, tmp_path):
+        """A full collection runs once every GC_EVERY_JOBS jobs"""
+        from worker.processor import ConversionWorker
+        
+        with patch('worker.processor.GC_EVERY_JOBS', 2), \
+                patch('worker.processor._release_memory') as mock_release:
+            worker = ConversionWorker()
+            for i in range(5):
+                worker._process_job(job_queue.add_job(f"{i}.txt", str(tmp_path / f"{i}.txt")))
+        
+        assert mock_release.call_count == 2
+
+    def test_worker_dispatches_by_extension(self, tmp_path):
+        """ODT jobs go to LibreOffice and unknown types fail"""
+        from worker.processor import ConversionWorker
+        
+        worker = ConversionWorker()
+        with patch.object(worker, '_get_odt_converter') as mock_get:
+            mock_odt = mock_get.return_value.convert
+            mock_odt.side_effect = lambda src, out: out
+            odt_job = job_queue.add_job("a.odt", str(tmp_path / "source.odt"))
+            txt_job = job_queue.add_job("a.txt", str(tmp_path / "source.txt"))
+            worker._process_job(odt_job)
+            worker._process_job(txt_job)
+        
+        mock_odt.assert_called_once_with(odt_job.source_path, odt_job.target_path)
+        assert job_queue.get_job(odt_job.job_id).status == JobStatus.COMPLETED
+        assert "Unsupported file type" in job_queue.get_job(txt_job.job_id).error
+
+    def test_concurrent_odt_jobs_use_separate_profiles(self, tmp_path):
+        """Two ODT jobs converting at once run soffice on different profiles"""
+        import threading
+        from worker.processor import ConversionWorker
+        
+        both_running = threading.Barrier(2, timeout=5)
+        profiles = []
+        
+        def fake_run(cmd, **kwargs):
+            both_running.wait()
+            profiles.append(next(arg for arg in cmd if arg.startswith("-env:UserInstallation=")))
+            outdir = cmd[cmd.index("--outdir") + 1]
+            (Path(outdir) / "source.pdf").write_bytes(b"%PDF")
+            return MagicMock(returncode=0)
+        
+        worker = ConversionWorker()
+        jobs = []
+        for name in ("a", "b"):
+            (tmp_path / name).mkdir()
+            source = tmp_path / name / "source.odt"
+            source.write_text("ODT content")
+            jobs.append(job_queue.add_job(f"{name}.odt", str(source)))
+        
+        with patch('src.odt_converter.core.get_libreoffice_path', return_value="soffice"), \
+                patch('src.odt_converter.core.subprocess.run', side_effect=fake_run):
+            threads = [threading.Thread(target=worker._process_job, args=(job,)) for job in jobs]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        
+        assert len(set(profiles)) == 2
+        for job in jobs:
+            assert job_queue.get_job(job.job_id).status == JobStatus.COMPLETED
 
 
 class TestWorkerIntegration:
@@ -130,6 +247,91 @@ class TestWorkerIntegration:
         worker.stop()
         assert not worker.is_running
     
+    def test_worker_runs_configured_thread_count(self):
+        """Worker should start one thread per configured slot"""
+        from worker.processor import ConversionWorker
+        
+        worker = ConversionWorker(poll_interval=0.1, concurrency=3)
+        worker.start()
+        
+        assert len(worker._threads) == 3
+        assert all(t.is_alive() for t in worker._threads)
+        
+        worker.stop()
+        assert not worker._threads
+    
+    def test_worker_warms_up_hwp_per_thread(self):
+        """Each thread starts its HWP converter before any job arrives"""
+        from worker.processor import ConversionWorker
+        
+        with patch('worker.processor.HwpToPdfConverter') as mock_cls:
+            worker = ConversionWorker(poll_interval=0.1, concurrency=2)
+            worker.start()
+            worker.stop()
+        
+        assert mock_cls.call_count == 2
+        assert mock_cls.return_value.warm_up.call_count == 2
+    
+    def test_worker_preloads_com_modules_on_start(self):
+        """pywin32 is imported once in start(), before threads need it"""
+        from worker.processor import ConversionWorker
+        
+        with patch('worker.processor.preload_com_modules', return_value=True) as mock_preload:
+            worker = ConversionWorker(poll_interval=0.1, warmup=False)
+            worker.start()
+            worker.stop()
+        
+        mock_preload.assert_called_once()
+    
+    def test_failed_warm_up_is_not_fatal(self):
+        """A thread whose HWP warm-up fails keeps running without a converter"""
+        from worker.processor import ConversionWorker
+        
+        with patch('worker.processor.HwpToPdfConverter') as mock_cls:
+            mock_cls.return_value.warm_up.side_effect = Exception("Class not registered")
+            mock_cls.return_value.close.return_value = True
+            worker = ConversionWorker(poll_interval=0.1)
+            worker.start()
+            time.sleep(0.1)
+            assert all(t.is_alive() for t in worker._threads)
+            worker.stop()
+        
+        mock_cls.return_value.close.assert_called_once()
+    
+    def test_worker_pins_threads_to_cpus(self):
+        """With pin_cpus each thread is pinned to one allowed CPU in turn"""
+        from worker.processor import ConversionWorker
+        
+        with patch('worker.processor._allowed_cpus', return_value=[2, 5]), \
+                patch('worker.processor.os.sched_setaffinity', create=True) as mock_pin:
+            worker = ConversionWorker(poll_interval=0.1, concurrency=3, pin_cpus=True)
+            worker.start()
+            worker.stop()
+        
+        assert sorted(min(c.args[1]) for c in mock_pin.call_args_list) == [2, 2, 5]
+    
+    def test_concurrency_from_env(self, monkeypatch):
+        """WORKER_CONCURRENCY accepts a count or "auto" (CPU count, capped)"""
+        from worker.processor import concurrency_from_env, MAX_AUTO_CONCURRENCY
+        
+        monkeypatch.setenv("WORKER_CONCURRENCY", "3")
+        assert concurrency_from_env() == 3
+        
+        monkeypatch.setenv("WORKER_CONCURRENCY", "auto")
+        monkeypatch.setattr("os.cpu_count", lambda: 64)
+        assert concurrency_from_env() == MAX_AUTO_CONCURRENCY
+        
+        monkeypatch.delenv("WORKER_CONCURRENCY")
+        assert concurrency_from_env() == 1
+    
+    @pytest.mark.parametrize("value", ["two", "", "0"])
+    def test_concurrency_from_env_falls_back_on_invalid_value(self, monkeypatch, value):
+        """A bad WORKER_CONCURRENCY runs one thread instead of failing startup"""
+        from worker.processor import concurrency_from_env
+        
+        monkeypatch.setenv("WORKER_CONCURRENCY", value)
+        assert concurrency_from_env() == 1
+    
     def test_worker_processes_queued_job(self, mock_converter, tmp_path):
         """Worker should automatically process queued jobs"""
         from worker.processor import ConversionWorker
@@ -1,56 +1,24 @@
 import os
+import subprocess
 import pytest
 from unittest.mock import patch, MagicMock
 from src.odt_converter.core import OdtToPdfConverter, OdtConversionError
+from src.odt_converter.utils import get_libreoffice_path
 
 class TestOdtToPdfConverter:
-    @patch("src.odt_converter.core.Path")
+    @patch("src.odt_converter.core.get_libreoffice_path", return_value="soffice")
     @patch("subprocess.run")
-    def test_convert_success(self, mock_run, mock_path):
+    def test_convert_success(self, mock_run, mock_soffice, tmp_path):
         # Arrange
         converter = OdtToPdfConverter()
-        input_path = "C:\\test\\input.odt"
-        output_path = "C:\\test\\output.pdf"
-        
-        mock_run.return_value = MagicMock(returncode=0)
-        
-        # Mock creating Path objects
-        mock_input_path_obj = MagicMock()
-        mock_input_path_obj.stem = "input"
-        mock_output_path_obj = MagicMock()
-        mock_output_dir_obj = MagicMock()
-        mock_output_path_obj.parent = mock_output_dir_obj
-        
-        # Create persistent mocks
-        input_mock = MagicMock()
-        input_mock.stem = "input"
-        input_mock.__str__.return_value = input_path
-        
-        output_mock = MagicMock()
-        output_mock.parent = mock_output_dir_obj
-        output_mock.__str__.return_value = output_path
-        
-        # Side effect for Path constructor
-        def path_side_effect(arg):
-            if str(arg) == input_path:
-                return input_mock
-            if str(arg) == output_path:
-                return output_mock
-            
-            # For other paths (like output dir)
-            new_mock = MagicMock()
-            new_mock.__str__.return_value = str(arg)
-            return new_mock
-            
-        mock_path.side_effect = path_side_effect
-        
-        # Determine expected output path logic
-        mock_expected_output = MagicMock()
-        mock_output_dir_obj.__truediv__.return_value = mock_expected_output
-        mock_expected_output.exists.return_value = True # Simulate PDF created
-        
-        # Configure output_mock existence check
-        output_mock.exists.return_value = False 
+        input_path = str(tmp_path / "input.odt")
+        output_path = str(tmp_path / "output.pdf")
+
+        def fake_run(cmd, **kwargs):
+            # LibreOffice names the PDF after the input file
+            (tmp_path / "input.pdf").write_bytes(b"%PDF-mock")
+            return MagicMock(returncode=0)
+        mock_run.side_effect = fake_run
 
         # Act
         result = converter.convert(input_path, output_path)
@@ -58,7 +26,79 @@ class TestOdtToPdfConverter:
         # Assert
         assert result == output_path
         mock_run.assert_called_once()
-        mock_expected_output.rename.assert_called_with(output_mock)
+        assert mock_run.call_args.kwargs["stdout"] == subprocess.DEVNULL
+        assert os.path.exists(output_path)
+        assert not os.path.exists(tmp_path / "input.pdf")
+
+    @patch("src.odt_converter.core.get_libreoffice_path", return_value="soffice")
+    @patch("subprocess.run")
+    def test_convert_replaces_existing_output(self, mock_run, mock_soffice, tmp_path):
+        output_path = tmp_path / "output.pdf"
+        output_path.write_bytes(b"stale")
+
+        def fake_run(cmd, **kwargs):
+            (tmp_path / "input.pdf").write_bytes(b"%PDF-mock")
+            return MagicMock(returncode=0)
+        mock_run.side_effect = fake_run
+
+        OdtToPdfConverter().convert(str(tmp_path / "input.odt"), str(output_path))
+
+        assert output_path.read_bytes() == b"%PDF-mock"
+
+    @patch("src.odt_converter.core.get_libreoffice_path", return_value="soffice")
+    @patch("subprocess.run")
+    def test_convert_bare_output_filename(self, mock_run, mock_soffice, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+
+        def fake_run(cmd, **kwargs):
+            outdir = cmd[cmd.index("--outdir") + 1]
+            (tmp_path / outdir / "input.pdf").write_bytes(b"%PDF-mock")
+            return MagicMock(returncode=0)
+        mock_run.side_effect = fake_run
+
+        result = OdtToPdfConverter().convert("input.odt", "out.pdf")
+
+        assert result == "out.pdf"
+        assert mock_run.call_args.args[0][mock_run.call_args.args[0].index("--outdir") + 1] == "."
+        assert (tmp_path / "out.pdf").read_bytes() == b"%PDF-mock"
+
+    @patch("src.odt_converter.utils.shutil.which")
+    @patch("subprocess.run")
+    def test_stale_soffice_path_is_resolved_again(self, mock_run, mock_which, tmp_path):
+        mock_which.side_effect = ["/old/soffice", "/new/soffice"]
+
+        def fake_run(cmd, **kwargs):
+            if cmd[0] == "/old/soffice":
+                raise FileNotFoundError(cmd[0])
+            (tmp_path / "input.pdf").write_bytes(b"%PDF-mock")
+            return MagicMock(returncode=0)
+        mock_run.side_effect = fake_run
+
+        get_libreoffice_path.cache_clear()
+        try:
+            OdtToPdfConverter().convert(str(tmp_path / "input.odt"), str(tmp_path / "input.pdf"))
+            assert get_libreoffice_path() == "/new/soffice"
+        finally:
+            get_libreoffice_path.cache_clear()
+
+        assert [c.args[0][0] for c in mock_run.call_args_list] == ["/old/soffice", "/new/soffice"]
+
+    @patch("src.odt_converter.core.get_libreoffice_path", return_value="soffice")
+    @patch("subprocess.run")
+    def test_convert_reports_soffice_stderr(self, mock_run, mock_soffice, tmp_path):
+        mock_run.return_value = MagicMock(returncode=1, stderr="변환 실패".encode("cp949"))
+
+        with pytest.raises(OdtConversionError, match="LibreOffice conversion failed"):
+            OdtToPdfConverter().convert(str(tmp_path / "input.odt"), str(tmp_path / "out.pdf"))
+
+    @patch("src.odt_converter.core.get_libreoffice_path", return_value="soffice")
+    @patch("subprocess.run")
+    def test_convert_lets_soffice_timeout_through(self, mock_run, mock_soffice, tmp_path):
+        mock_run.side_effect = subprocess.TimeoutExpired("soffice", 5)
+
+        with pytest.raises(subprocess.TimeoutExpired):
+            OdtToPdfConverter(timeout=5).convert(str(tmp_path / "input.odt"), str(tmp_path / "out.pdf"))
+        assert mock_run.call_args.kwargs["timeout"] == 5
 
     @patch("subprocess.run")
     def test_convert_failure(self, mock_run):
@@ -0,0 +1,221 @@
+"""Unit tests for the in-memory job queue"""
+import os
+import threading
+import time
+
+import pytest
+
+from api.queue import JobQueue
+from api.models import JobStatus
+
+
+@pytest.fixture
+def queue():
+    """Create an isolated queue instance"""
+    return JobQueue()
+
+
+class TestGetNextPending:
+    """Tests for JobQueue.get_next_pending"""
+
+    def test_returns_jobs_in_fifo_order(self, queue):
+        """Pending jobs are handed out oldest first"""
+        first = queue.add_job("a.hwp", "/tmp/a.hwp")
+        second = queue.add_job("b.hwp", "/tmp/b.hwp")
+
+        assert queue.get_next_pending().job_id == first.job_id
+        assert queue.get_next_pending().job_id == second.job_id
+        assert queue.get_next_pending() is None
+
+    def test_skips_jobs_no_longer_pending(self, queue):
+        """Jobs that left PENDING before pickup are discarded"""
+        failed = queue.add_job("a.hwp", "/tmp/a.hwp")
+        pending = queue.add_job("b.hwp", "/tmp/b.hwp")
+        queue.update_status(failed.job_id, JobStatus.FAILED, error="upload failed")
+
+        assert queue.get_next_pending().job_id == pending.job_id
+        assert queue.get_next_pending() is None
+
+    def test_clear_drops_pending(self, queue):
+        """Clearing the queue also empties the pending order"""
+        queue.add_job("a.hwp", "/tmp/a.hwp")
+        queue.clear()
+
+        assert queue.get_next_pending() is None
+
+
+class TestGetNextPendingBlocking:
+    """Tests for JobQueue.get_next_pending_blocking"""
+
+    def test_wakes_when_job_is_enqueued(self, queue):
+        """A waiting worker picks up a job without waiting out its timeout"""
+        result = []
+        waiter = threading.Thread(target=lambda: result.append(queue.get_next_pending_blocking(5)))
+        waiter.start()
+        time.sleep(0.05)
+
+        start = time.monotonic()
+        job = queue.add_job("a.hwp", "/tmp/a.hwp")
+        waiter.join(timeout=5)
+
+        assert result[0].job_id == job.job_id
+        assert time.monotonic() - start < 1
+
+    def test_times_out_when_empty(self, queue):
+        """An empty queue returns None after the timeout"""
+        assert queue.get_next_pending_blocking(0.05) is None
+
+    def test_unqueued_job_is_not_handed_out(self, queue):
+        """Jobs added with enqueue=False wait for an explicit enqueue()"""
+        job = queue.add_job("a.hwp", "", enqueue=False)
+
+        assert queue.get_next_pending_blocking(0.05) is None
+
+        queue.enqueue(job.job_id)
+        assert queue.get_next_pending_blocking(0.05).job_id == job.job_id
+
+    def test_wake_waiters_releases_blocked_worker(self, queue):
+        """Waking waiters lets a blocked worker return early, e.g. on shutdown"""
+        result = []
+        waiter = threading.Thread(target=lambda: result.append(queue.get_next_pending_blocking(5)))
+        waiter.start()
+        time.sleep(0.05)
+
+        queue.wake_waiters()
+        waiter.join(timeout=1)
+
+        assert not waiter.is_alive()
+        assert result == [None]
+
+
+class TestGetNextPendingBatch:
+    """Tests for JobQueue.get_next_pending_batch"""
+
+    def test_claims_up_to_n_jobs_in_order(self, queue):
+        """A batch takes the oldest pending jobs and leaves the rest queued"""
+        jobs = [queue.add_job(f"{i}.hwp", f"/tmp/{i}.hwp") for i in range(5)]
+
+        batch = queue.get_next_pending_batch(3)
+
+        assert [job.job_id for job in batch] == [job.job_id for job in jobs[:3]]
+        assert [job.job_id for job in queue.get_next_pending_batch(3)] == [
+            job.job_id for job in jobs[3:]
+        ]
+        assert queue.get_next_pending_batch(3) == []
+
+    def test_empty_queue_waits_for_timeout(self, queue):
+        """An empty queue returns an empty batch after the timeout"""
+        assert queue.get_next_pending_batch(4, timeout=0.05) == []
+
+
+class TestJobPaths:
+    """Tests for the paths derived from a job's source file"""
+
+    def test_paths_derived_on_add(self, queue):
+        """The extension and PDF target are computed when the job is added"""
+        job = queue.add_job("a.HWPX", os.path.join("jobs", "1", "source.HWPX"))
+
+        assert job.source_ext == ".hwpx"
+        assert job.target_path == os.path.join("jobs", "1", "output.pdf")
+
+    def test_enqueue_sets_source_path(self, queue):
+        """A job registered before its file was saved gets its paths on enqueue"""
+        job = queue.add_job("a.odt", "", enqueue=False)
+        source = os.path.join("jobs", "1", "source.odt")
+
+        queue.enqueue(job.job_id, source)
+
+        queued = queue.get_next_pending()
+        assert queued.source_path == source
+        assert queued.source_ext == ".odt"
+        assert queued.target_path == os.path.join("jobs", "1", "output.pdf")
+
+
+class TestGetAllJobs:
+    """Tests for JobQueue.get_all_jobs"""
+
+    def test_returns_jobs_from_every_shard(self, queue):
+        """All jobs are listed regardless of which shard holds them"""
+        added = {queue.add_job(f"{i}.hwp", f"/tmp/{i}.hwp").job_id for i in range(50)}
+
+        assert {job.job_id for job in queue.get_all_jobs()} == added
+
+
+class TestUpdateStatus:
+    """Tests for JobQueue.update_status"""
+
+    def test_update_swaps_in_new_snapshot(self, queue):
+        """Readers holding an old reference keep a consistent view"""
+        job = queue.add_job("a.hwp", "/tmp/a.hwp")
+
+        assert queue.update_status(job.job_id, JobStatus.COMPLETED, output_path="/tmp/a.pdf")
+
+        updated = queue.get_job(job.job_id)
+        assert updated.status == JobStatus.COMPLETED
+        assert updated.output_path == "/tmp/a.pdf"
+        assert updated.completed_at is not None
+        assert job.status == JobStatus.PENDING
+        assert job.output_path is None
+
+    def test_update_unknown_job(self, queue):
+        """Updating a missing job reports failure"""
+        assert not queue.update_status("missing", JobStatus.FAILED)
+
+
+class TestBeginJob:
+    """Tests for JobQueue.begin_job"""
+
+    def test_marks_processing_then_completed(self, queue, tmp_path):
+        """The job is PROCESSING inside the block and takes the recorded outcome"""
+        pdf_file = tmp_path / "a.pdf"
+        pdf_file.write_bytes(b"%PDF-mock")
+        job = queue.add_job("a.hwp", "/tmp/a.hwp")
+
+        with queue.begin_job(job.job_id) as commit:
+            assert queue.get_job(job.job_id).status == JobStatus.PROCESSING
+            commit.complete(str(pdf_file))
+
+        finished = queue.get_job(job.job_id)
+        assert finished.status == JobStatus.COMPLETED
+        assert finished.output_verified
+
+    def test_block_without_outcome_fails_job(self, queue):
+        """An exception escaping the block marks the job FAILED"""
+        job = queue.add_job("a.hwp", "/tmp/a.hwp")
+
+        with pytest.raises(RuntimeError):
+            with queue.begin_job(job.job_id):
+                raise RuntimeError("boom")
+
+        failed = queue.get_job(job.job_id)
+        assert failed.status == JobStatus.FAILED
+        assert failed.error == "Unexpected error: boom"
+
+
+class TestRetention:
+    """Tests for bounded retention of finished jobs"""
+
+    def test_oldest_finished_jobs_are_evicted(self):
+        """Only the most recent finished jobs are kept"""
+        queue = JobQueue(max_finished_jobs=2)
+        jobs = [queue.add_job(f"{i}.hwp", f"/tmp/{i}.hwp") for i in range(3)]
+        for job in jobs:
+            queue.update_status(job.job_id, JobStatus.FAILED, error="boom")
+
+        assert queue.get_job(jobs[0].job_id) is None
+        assert queue.get_job(jobs[1].job_id) is not None
+        assert queue.get_job(jobs[2].job_id) is not None
+
+    def test_unfinished_jobs_are_never_evicted(self):
+        """Pending and processing jobs do not count against the limit"""
+        queue = JobQueue(max_finished_jobs=1)
+        pending = queue.add_job("a.hwp", "/tmp/a.hwp")
+        processing = queue.add_job("b.hwp", "/tmp/b.hwp")
+        queue.update_status(processing.job_id, JobStatus.PROCESSING)
+        for i in range(3):
+            job = queue.add_job(f"{i}.hwp", f"/tmp/{i}.hwp")
+            queue.update_status(job.job_id, JobStatus.FAILED, error="boom")
+
+        assert queue.get_job(pending.job_id) is not None
+        assert queue.get_job(processing.job_id) is not None
+        assert len(queue.get_all_jobs()) == 3
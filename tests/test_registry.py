@@ -0,0 +1,43 @@
+"""Unit tests for HWP registry helpers (Mock-based)"""
+import pytest
+from unittest.mock import patch, MagicMock
+
+from src.hwp_converter import registry
+
+
+@pytest.fixture
+def mock_winreg():
+    """Patch winreg and reset the in-process registration cache"""
+    with patch.object(registry, "_SEC_MODULE_CACHE", None), \
+            patch.object(registry, "winreg") as mock_reg:
+        mock_reg.OpenKey.return_value = MagicMock()
+        mock_reg.CreateKeyEx.return_value = MagicMock()
+        yield mock_reg
+
+
+class TestSecurityModuleCache:
+    """Tests for caching the security module registration check"""
+
+    def test_check_reads_registry_once(self, mock_winreg):
+        assert registry.check_security_module_registered()
+        assert registry.check_security_module_registered()
+
+        mock_winreg.OpenKey.assert_called_once()
+
+    def test_ensure_skips_registry_once_registered(self, mock_winreg):
+        mock_winreg.OpenKey.side_effect = FileNotFoundError
+
+        registry.ensure_security_module()
+        registry.ensure_security_module()
+
+        mock_winreg.OpenKey.assert_called_once()
+        mock_winreg.SetValueEx.assert_called_once()
+        assert registry.check_security_module_registered()
+
+    def test_keys_opened_with_minimal_access(self, mock_winreg):
+        mock_winreg.OpenKey.side_effect = FileNotFoundError
+
+        registry.ensure_security_module()
+
+        assert mock_winreg.OpenKey.call_args.args[3] == mock_winreg.KEY_READ
+        assert mock_winreg.CreateKeyEx.call_args.args[3] == mock_winreg.KEY_SET_VALUE
@@ -1,44 +1,122 @@
 """Background worker for processing HWP to PDF conversions"""
+import ctypes
+import gc
+import itertools
 import logging
+import os
+import shutil
+import subprocess
+import tempfile
 import threading
 import time
-from pathlib import Path
-from typing import Optional
+from typing import Callable, Dict, List, Optional
 
 from api.queue import job_queue, Job
-from api.models import JobStatus
-from src.hwp_converter import HwpToPdfConverter, HwpConverterError
+from src.hwp_converter import (
+    HwpToPdfConverter,
+    HwpConverterError,
+    HwpInitializationError,
+    HwpTimeoutError,
+)
+from src.hwp_converter.core import HWP_EXTENSIONS, preload_com_modules
 from src.odt_converter.core import OdtToPdfConverter, OdtConversionError
 
 logger = logging.getLogger(__name__)
 
+# Upper bound for WORKER_CONCURRENCY=auto; every thread drives its own HWP
+# instance, so more threads than cores only adds memory and contention
+MAX_AUTO_CONCURRENCY = 4
+
+# Jobs a lone worker thread claims per queue lock acquisition
+DEFAULT_BATCH_SIZE = 4
+
+# Extensions converted through LibreOffice
+ODT_EXTENSIONS = frozenset({".odt", ".docx"})
+
+# Run a full garbage collection after this many jobs to bound worker RSS
+GC_EVERY_JOBS = 50
+
+# glibc can hand freed arenas back to the OS; absent on Windows and musl
+try:
+    _malloc_trim = ctypes.CDLL("libc.so.6").malloc_trim
+except (OSError, AttributeError):
+    _malloc_trim = None
+
+
+def _allowed_cpus() -> List[int]:
+    """CPUs this process may run on, or [] where affinity isn't supported"""
+    if not hasattr(os, "sched_getaffinity"):
+        return []
+    return sorted(os.sched_getaffinity(0))
+
+
+def _release_memory() -> None:
+    """Collect garbage and return freed heap memory to the OS where possible"""
+    gc.collect()
+    if _malloc_trim is not None:
+        _malloc_trim(0)
+
 
 class ConversionWorker:
     """
-    Background worker that polls the job queue and processes conversions.
+    Background worker that waits on the job queue and processes conversions.
+    
+    Each of the `concurrency` threads keeps its own HWP and LibreOffice
+    converters for its whole lifetime.
     """
     
-    def __init__(self, poll_interval: float = 1.0, timeout: int = 30):
+    def __init__(
+        self,
+        poll_interval: float = 1.0,
+        timeout: int = 30,
+        concurrency: int = 1,
+        batch_size: Optional[int] = None,
+        pin_cpus: bool = False,
+        warmup: bool = True,
+    ):
         self.poll_interval = poll_interval
         self.timeout = timeout
+        self.concurrency = max(1, concurrency)
+        if batch_size is None:
+            batch_size = DEFAULT_BATCH_SIZE if self.concurrency == 1 else 1
+        self.batch_size = max(1, batch_size)
+        self.pin_cpus = pin_cpus
+        self.warmup = warmup
         self._running = False
-        self._thread: Optional[threading.Thread] = None
+        self._threads: List[threading.Thread] = []
         self._lock = threading.Lock()
+        self._local = threading.local()
+        # next() on a count is atomic under the GIL, so threads can share it
+        self._jobs_done = itertools.count(1)
     
     def start(self) -> None:
-        """Start the worker thread"""
+        """Start the worker threads"""
         with self._lock:
             if self._running:
                 logger.warning("Worker is already running")
                 return
             
             self._running = True
-            self._thread = threading.Thread(target=self._run, daemon=True)
-            self._thread.start()
-            logger.info("Conversion worker started")
+            # Import pywin32 once here rather than on the first thread to need
+            # it, where every other thread would wait on the import lock
+            if not preload_com_modules():
+                logger.info("pywin32 not available; HWP conversions will fail")
+            cpus = _allowed_cpus() if self.pin_cpus else []
+            self._threads = [
+                threading.Thread(
+                    target=self._run,
+                    args=(cpus[i % len(cpus)] if cpus else None,),
+                    name=f"conversion-worker-{i}",
+                    daemon=True,
+                )
+                for i in range(self.concurrency)
+            ]
+            for thread in self._threads:
+                thread.start()
+            logger.info("Conversion worker started with %d thread(s)", self.concurrency)
     
     def stop(self) -> None:
-        """Stop the worker thread"""
+        """Stop the worker threads"""
         with self._lock:
             if not self._running:
                 return
@@ -46,68 +124,136 @@ class ConversionWorker:
             self._running = False
             logger.info("Stopping conversion worker...")
         
-        if self._thread:
-            self._thread.join(timeout=5)
+        # Threads blocked waiting for work re-check _running right away
+        job_queue.wake_waiters()
+        if self._threads:
+            for thread in self._threads:
+                thread.join(timeout=5)
+            self._threads = []
             logger.info("Conversion worker stopped")
     
-    def _run(self) -> None:
+    def _run(self, cpu: Optional[int] = None) -> None:
         """Main worker loop"""
-        while self._running:
+        if cpu is not None:
+            # pid 0 is the calling thread; children spawned later inherit the mask
             try:
-                job = job_queue.get_next_pending()
-                if job:
-                    self._process_job(job)
-                else:
+                os.sched_setaffinity(0, {cpu})
+            except OSError as e:
+                logger.warning("Could not pin %s to CPU %d: %s", threading.current_thread().name, cpu, e)
+        try:
+            if self.warmup:
+                self._warm_up()
+            while self._running:
+                try:
+                    # Wakes as soon as a job is enqueued; the timeout only
+                    # bounds how long a stop() can go unnoticed
+                    jobs = job_queue.get_next_pending_batch(self.batch_size, self.poll_interval)
+                    for job in jobs:
+                        self._process_job(job)
+                except Exception as e:
+                    logger.exception("Unexpected error in worker loop: %s", e)
                     time.sleep(self.poll_interval)
-            except Exception as e:
-                logger.exception(f"Unexpected error in worker loop: {e}")
-                time.sleep(self.poll_interval)
+        finally:
+            # COM objects must be released on the thread that created them
+            self._release_converter()
+    
+    def _get_hwp_converter(self) -> HwpToPdfConverter:
+        """Get this thread's HWP converter, creating it on first use"""
+        converter = getattr(self._local, "hwp", None)
+        if converter is None:
+            converter = HwpToPdfConverter(timeout=self.timeout)
+            self._local.hwp = converter
+        return converter
+    
+    def _warm_up(self) -> None:
+        """Create and start this thread's HWP converter ahead of the first job"""
+        try:
+            self._get_hwp_converter().warm_up()
+        except Exception as e:
+            # Not fatal: ODT jobs don't need HWP and HWP jobs retry on demand
+            logger.warning("HWP warm-up failed on %s: %s", threading.current_thread().name, e)
+            self._discard_hwp_converter()
+    
+    def _get_odt_converter(self) -> OdtToPdfConverter:
+        """Get this thread's LibreOffice converter, with a profile of its own"""
+        converter = getattr(self._local, "odt", None)
+        if converter is None:
+            profile_dir = os.path.join(
+                tempfile.gettempdir(), f"hwp-pdf-lo-{os.getpid()}-{threading.get_ident()}"
+            )
+            converter = OdtToPdfConverter(profile_dir=profile_dir)
+            self._local.odt = converter
+        return converter
+    
+    def _release_converter(self) -> None:
+        """Close this thread's HWP converter and remove its LibreOffice profile"""
+        converter = getattr(self._local, "hwp", None)
+        if converter is not None:
+            self._local.hwp = None
+            converter.close()
+        odt_converter = getattr(self._local, "odt", None)
+        if odt_converter is not None:
+            self._local.odt = None
+            shutil.rmtree(odt_converter.profile_dir, ignore_errors=True)
+    
+    def _discard_hwp_converter(self) -> None:
+        """Drop a crashed or hung HWP converter so the next job starts a fresh one"""
+        converter = self._local.hwp
+        self._local.hwp = None
+        if not converter.close():
+            converter.kill_hwp_process()
+    
+    def _convert_hwp(self, source_path: str, output_path: str) -> str:
+        """Convert on this thread's HWP instance, recovering it on failure"""
+        converter = self._get_hwp_converter()
+        try:
+            return converter.convert(source_path, output_path)
+        except (HwpInitializationError, HwpTimeoutError):
+            # HWP itself is broken, not just this document
+            self._discard_hwp_converter()
+            raise
+        except Exception:
+            # Drop the half-open document before the next job reuses HWP
+            converter.reset()
+            raise
+    
+    def _convert_odt(self, source_path: str, output_path: str) -> str:
+        """Convert through LibreOffice"""
+        return self._get_odt_converter().convert(source_path, output_path)
     
     def _process_job(self, job: Job) -> None:
         """Process a single job"""
-        logger.info(f"Processing job {job.job_id}: {job.source_filename}")
-        
-        # Update status to processing
-        job_queue.update_status(job.job_id, JobStatus.PROCESSING)
+        # Per-job chatter is DEBUG with lazy formatting; the thread name is
+        # available to handlers as %(threadName)s
+        logger.debug("Processing job %s: %s", job.job_id, job.source_filename)
         
         try:
-            # Determine output path
-            source_path = Path(job.source_path)
-            output_path = source_path.parent / "output.pdf"
-            ext = source_path.suffix.lower()
-            
-            # Perform conversion based on type
-            if ext in ('.hwp', '.hwpx'):
-                with HwpToPdfConverter(timeout=self.timeout) as converter:
-                    result_path = converter.convert(str(source_path), str(output_path))
-            elif ext in ('.odt', '.docx'):
-                 converter = OdtToPdfConverter()
-                 result_path = converter.convert(str(source_path), str(output_path))
-            else:
-                raise ValueError(f"Unsupported file type: {ext}")
-            
-            # Update status to completed
-            job_queue.update_status(
-                job.job_id, 
-                JobStatus.COMPLETED, 
-                output_path=result_path
-            )
-            logger.info(f"Job {job.job_id} completed: {result_path}")
-            
-        except (HwpConverterError, OdtConversionError) as e:
-            logger.error(f"Job {job.job_id} failed: {e}")
-            job_queue.update_status(
-                job.job_id, 
-                JobStatus.FAILED, 
-                error=str(e)
-            )
-        except Exception as e:
-            logger.exception(f"Unexpected error processing job {job.job_id}")
-            job_queue.update_status(
-                job.job_id, 
-                JobStatus.FAILED, 
-                error=f"Unexpected error: {e}"
-            )
+            with job_queue.begin_job(job.job_id) as commit:
+                try:
+                    # Paths were derived once when the job was queued
+                    convert = _CONVERTERS.get(job.source_ext)
+                    if convert is None:
+                        raise ValueError(f"Unsupported file type: {job.source_ext}")
+                    result_path = convert(self, job.source_path, job.target_path)
+                    
+                    commit.complete(result_path)
+                    logger.debug("Job %s completed: %s", job.job_id, result_path)
+                    
+                except (HwpConverterError, OdtConversionError) as e:
+                    logger.error("Job %s failed: %s", job.job_id, e)
+                    commit.fail(str(e))
+                except (FileNotFoundError, subprocess.TimeoutExpired) as e:
+                    # Routine failures: the message says it all, skip the traceback
+                    logger.warning("Job %s failed: %s", job.job_id, e)
+                    commit.fail(str(e))
+                except Exception as e:
+                    logger.exception("Unexpected error processing job %s", job.job_id)
+                    commit.fail(f"Unexpected error: {e}")
+        finally:
+            # Conversions leave large short-lived buffers behind; collecting
+            # every few jobs keeps them from fragmenting a long-lived heap
+            if next(self._jobs_done) % GC_EVERY_JOBS == 0:
+                _release_memory()
     
     @property
     def is_running(self) -> bool:
@@ -115,5 +261,39 @@ class ConversionWorker:
         return self._running
 
 
-# Global worker instance
-worker = ConversionWorker()
+def concurrency_from_env() -> int:
+    """
+    Number of worker threads from WORKER_CONCURRENCY.
+    
+    "auto" sizes the pool to the CPU count, capped at MAX_AUTO_CONCURRENCY.
+    Defaults to 1 because a stuck HWP instance is recovered with a taskkill
+    that takes down every hwp.exe, including other threads' instances.
+    Values that are not a positive count fall back to 1 with a warning, since
+    this runs at import time and must not keep the API from starting.
+    """
+    value = os.environ.get("WORKER_CONCURRENCY", "1").strip().lower()
+    if value == "auto":
+        return min(os.cpu_count() or 1, MAX_AUTO_CONCURRENCY)
+    try:
+        count = int(value)
+    except ValueError:
+        count = 0
+    if count < 1:
+        logger.warning("Invalid WORKER_CONCURRENCY %r, using 1 worker thread", value)
+        return 1
+    return count
+
+
+# Conversion method per source extension
+_CONVERTERS: Dict[str, Callable[[ConversionWorker, str, str], str]] = {
+    **{ext: ConversionWorker._convert_hwp for ext in HWP_EXTENSIONS},
+    **{ext: ConversionWorker._convert_odt for ext in ODT_EXTENSIONS},
+}
+
+
+# Global worker instance; WORKER_CONCURRENCY sets the number of parallel
+# conversions and WORKER_PIN_CPUS=1 pins each worker thread to a CPU
+worker = ConversionWorker(
+    concurrency=concurrency_from_env(),
+    pin_cpus=os.environ.get("WORKER_PIN_CPUS") == "1",
+)